@@ -1,20 +1,23 @@
 """CLI application using Typer."""
 import click.exceptions
-import filecmp
+import contextlib
 import json
 import os
+import shlex
 import shutil
+import subprocess
+import tempfile
 import time
+import traceback
 from typing import NoReturn, Optional
 
-import questionary
 import typer
 
 from . import __version__
 from .colors import Colors, init_colors
 from .paths import TemplatesDirNotFound
 from .config import get_config_file, get_configured_repos, get_nix_config_file, load_config, save_config
-from .paths import get_repos_parent, get_templates_dir, get_config_dir, is_windows
+from .paths import ensure_dir, get_repos_parent, get_templates_dir, get_config_dir, is_windows, list_subdirs
 from .project_types import PROJECT_TYPES, get_type_names, get_display_names
 from .project import (
     Project,
@@ -24,9 +27,10 @@ from .project import (
     get_repos_to_search,
 )
 from .templates import (
+    copy_file,
     copyanything,
-    find_replace,
-    rename_files,
+    rename_and_replace,
+    same_file_contents,
 )
 from .thunderstore import (
     CACHE_DURATION,
@@ -41,6 +45,7 @@ from .thunderstore import (
     get_latest_version_entries,
     get_unreleased_entries,
     has_unreleased_version,
+    write_file_atomic,
 )
 
 app = typer.Typer(
@@ -55,8 +60,7 @@ def _get_repos_for_completion(repos_parent: str) -> list[str]:
     current_repo = detect_current_repo(repos_parent)
     if current_repo:
         return [current_repo]
-    config = load_config()
-    return config.get('repos', [])
+    return get_configured_repos()
 
 
 def _escape_for_completion(name: str) -> str:
@@ -66,12 +70,19 @@ def _escape_for_completion(name: str) -> str:
     return name
 
 
+def _completion_prefix(incomplete: str) -> str:
+    """Strip the opening quote the shell leaves on a partially typed quoted name."""
+    return incomplete.lstrip('"\'')
+
+
 def _complete_project_names_without_metadata(incomplete: str) -> list[str]:
     """Autocompletion for project names (only projects WITHOUT Thunderstore metadata)."""
     try:
         repos_parent = str(get_repos_parent())
         repos = _get_repos_for_completion(repos_parent)
-        projects = find_projects(repos_parent, repos, exclude_with_metadata=True)
+        projects = find_projects(
+            repos_parent, repos, exclude_with_metadata=True, name_prefix=_completion_prefix(incomplete),
+        )
         return [_escape_for_completion(p.name) for p in projects]
     except TemplatesDirNotFound:
         return []
@@ -82,7 +93,9 @@ def _complete_project_names_with_metadata(incomplete: str) -> list[str]:
     try:
         repos_parent = str(get_repos_parent())
         repos = _get_repos_for_completion(repos_parent)
-        projects = find_projects(repos_parent, repos, require_metadata=True)
+        projects = find_projects(
+            repos_parent, repos, require_metadata=True, name_prefix=_completion_prefix(incomplete),
+        )
         return [_escape_for_completion(p.name) for p in projects]
     except TemplatesDirNotFound:
         return []
@@ -95,9 +108,8 @@ def _complete_project_type(incomplete: str) -> list[str]:
 
 def _complete_repos(incomplete: str) -> list[str]:
     """Autocompletion for repository names."""
-    config = load_config()
-    repos = config.get('repos', [])
-    return [r for r in repos if r.lower().startswith(incomplete.lower())]
+    incomplete = incomplete.lower()
+    return [r for r in get_configured_repos() if r.lower().startswith(incomplete)]
 
 
 def _complete_none(incomplete: str) -> list[str]:
@@ -129,6 +141,8 @@ def select_projects_interactive(
     allow_batch: bool = True
 ) -> list[Project]:
     """Interactive project selection for commands."""
+    import questionary
+
     repos, is_single_repo = get_repos_to_search(repos_parent, use_all_repos)
     if not repos:
         print(f"{Colors.FAIL}Error: No repos configured. Use 'bt config add-repo' to add repos.{Colors.ENDC}")
@@ -196,6 +210,8 @@ def do_create_project(
     with_rocketlib: bool = False,
 ) -> None:
     """Create a new project from templates."""
+    import questionary
+
     template_dir = get_templates_dir()
     repos_parent = str(get_repos_parent())
     scripts_dir = os.path.join(template_dir, 'Scripts')
@@ -316,15 +332,29 @@ def do_create_project(
     templatePath = os.path.join(template_dir, source_template_name)
     output_repo_path = os.path.join(repos_parent, output_repo_name)
 
-    if not os.path.exists(output_repo_path):
+    # One listing of the output repo answers the layout and name-collision checks below
+    try:
+        with os.scandir(output_repo_path) as it:
+            repo_entries = {entry.name: entry for entry in it}
+    except OSError:
         print(f"{Colors.FAIL}Error: Output repository does not exist: {output_repo_path}{Colors.ENDC}")
         print(f"{Colors.WARNING}Please ensure the repository '{output_repo_name}' exists in: {repos_parent}{Colors.ENDC}")
         raise typer.Exit(1)
 
-    if type_info and type_info["has_code"] and output_repo_path != template_dir:
+    def is_repo_subdir(dir_name: str) -> bool:
+        entry = repo_entries.get(dir_name)
+        return entry is not None and entry.is_dir()
+
+    # template_dir is a Path, so compare the directories themselves rather than strings
+    try:
+        is_template_repo = os.path.samefile(output_repo_path, template_dir)
+    except OSError:
+        is_template_repo = False
+
+    if type_info and type_info["has_code"] and not is_template_repo:
         output_scripts_dir = os.path.join(output_repo_path, 'Scripts')
-        if not os.path.exists(output_scripts_dir):
-            os.makedirs(output_scripts_dir)
+        if 'Scripts' not in repo_entries:
+            os.makedirs(output_scripts_dir, exist_ok=True)
             print(f"{Colors.GREEN}Created Scripts directory: {output_scripts_dir}{Colors.ENDC}")
 
         targets_source = os.path.join(scripts_dir, 'BroforceModBuild.targets')
@@ -333,12 +363,12 @@ def do_create_project(
         if os.path.exists(targets_source):
             try:
                 if not os.path.exists(targets_dest):
-                    shutil.copy2(targets_source, targets_dest)
+                    copy_file(targets_source, targets_dest)
                     print(f"{Colors.GREEN}Copied BroforceModBuild.targets to output repository{Colors.ENDC}")
                 else:
-                    if not filecmp.cmp(targets_source, targets_dest, shallow=False):
+                    if not same_file_contents(targets_source, targets_dest):
                         try:
-                            shutil.copy2(targets_source, targets_dest)
+                            copy_file(targets_source, targets_dest)
                             print(f"{Colors.GREEN}Updated BroforceModBuild.targets in output repository{Colors.ENDC}")
                         except PermissionError:
                             print(f"{Colors.WARNING}Warning: Could not update BroforceModBuild.targets (file in use){Colors.ENDC}")
@@ -351,133 +381,98 @@ def do_create_project(
 
     releases_dir = os.path.join(output_repo_path, 'Releases')
     release_dir = os.path.join(output_repo_path, 'Release')
-    if os.path.isdir(release_dir) and not os.path.isdir(releases_dir):
+    if is_repo_subdir('Release') and not is_repo_subdir('Releases'):
         base_release = release_dir
     else:
         base_release = releases_dir
     newReleaseFolder = os.path.join(base_release, newName)
     newRepoPath = os.path.join(output_repo_path, newName)
 
-    if not os.path.exists(templatePath):
-        print(f"{Colors.FAIL}Error: Template directory not found: {templatePath}{Colors.ENDC}")
-        print(f"Please ensure the '{source_template_name}' directory exists in your repository.")
-        raise typer.Exit(1)
-
-    if os.path.exists(newReleaseFolder):
-        print(f"{Colors.FAIL}Error: Release directory already exists: {newReleaseFolder}{Colors.ENDC}")
-        print(f"Please choose a different {template_type} name or remove the existing directory.")
-        raise typer.Exit(1)
-
+    # exists() rather than the listing, so case-insensitive filesystems catch case variants
     if os.path.exists(newRepoPath):
         print(f"{Colors.FAIL}Error: Repository directory already exists: {newRepoPath}{Colors.ENDC}")
         print(f"Please choose a different {template_type} name or remove the existing directory.")
         raise typer.Exit(1)
 
-    try:
-        os.makedirs(newReleaseFolder, exist_ok=True)
-        copyanything(templatePath, newRepoPath)
-    except Exception as e:
-        print(f"{Colors.FAIL}Error: Failed to copy template files: {e}{Colors.ENDC}")
-        if os.path.exists(newReleaseFolder):
-            shutil.rmtree(newReleaseFolder)
-        if os.path.exists(newRepoPath):
-            shutil.rmtree(newRepoPath)
-        raise typer.Exit(1)
-
-    try:
-        rename_files(newRepoPath, source_template_name, newName)
-        rename_files(newRepoPath, type_info["class_prefix"], newNameNoSpaces)
-
-        fileTypes = type_info["file_patterns"]
-
-        for fileType in fileTypes:
-            find_replace(newRepoPath, source_template_name, newName, fileType)
-            find_replace(newRepoPath, source_template_name.replace(' ', '_'), newNameWithUnderscore, fileType)
-            find_replace(newRepoPath, type_info["class_prefix"], newNameNoSpaces, fileType)
-
-            find_replace(newRepoPath, "AUTHOR_NAME", authorName, fileType)
-            find_replace(newRepoPath, "REPO_NAME", output_repo_name, fileType)
-
-        if template_type == "bro":
-            find_replace(newRepoPath, "BroTemplate.cs", f"{newNameNoSpaces}.cs", "*.csproj")
-
-            dep_versions = get_dependency_versions()
-            bromaker_version = dep_versions.get('BroMaker', '2.6.0')
-
-            find_replace(newRepoPath, "BROMAKER_VERSION", bromaker_version, "*.json")
+    # Roll back the new directories if anything below fails; disarmed on success.
+    # The project is assembled in a hidden staging folder (always removed) and
+    # renamed into place once processed, so a half-built project never appears.
+    with contextlib.ExitStack() as cleanup, contextlib.ExitStack() as rollback:
+        try:
+            os.makedirs(newReleaseFolder)
+            rollback.callback(shutil.rmtree, newReleaseFolder, ignore_errors=True)
+            staging = cleanup.enter_context(tempfile.TemporaryDirectory(prefix='.staging-', dir=output_repo_path))
+            stagedRepoPath = os.path.join(staging, newName)
+            copyanything(templatePath, stagedRepoPath)
+        except FileExistsError:
+            print(f"{Colors.FAIL}Error: Release directory already exists: {newReleaseFolder}{Colors.ENDC}")
+            print(f"Please choose a different {template_type} name or remove the existing directory.")
+            raise typer.Exit(1)
+        except Exception as e:
+            # Missing templates surface from the copy itself rather than a separate exists() check
+            if isinstance(e, FileNotFoundError) and e.filename == templatePath:
+                print(f"{Colors.FAIL}Error: Template directory not found: {templatePath}{Colors.ENDC}")
+                print(f"Please ensure the '{source_template_name}' directory exists in your repository.")
+            else:
+                print(f"{Colors.FAIL}Error: Failed to copy template files: {e}{Colors.ENDC}")
+            raise typer.Exit(1)
 
-        if with_rocketlib and type_info["has_code"]:
-            csproj_path = None
-            for root, dirs, files in os.walk(newRepoPath):
-                for f in files:
-                    if f.endswith('.csproj'):
-                        csproj_path = os.path.join(root, f)
-                        break
-                if csproj_path:
-                    break
-            if csproj_path:
-                with open(csproj_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                rocketlib_ref = (
+        try:
+            renames = [
+                (source_template_name, newName),
+                (type_info["class_prefix"], newNameNoSpaces),
+            ]
+
+            # Renames and substitutions share one walk, reading and writing each file once
+            replace_rules = []
+            for fileType in type_info["file_patterns"]:
+                replace_rules += [
+                    (fileType, source_template_name, newName),
+                    (fileType, source_template_name.replace(' ', '_'), newNameWithUnderscore),
+                    (fileType, type_info["class_prefix"], newNameNoSpaces),
+                    (fileType, "AUTHOR_NAME", authorName),
+                    (fileType, "REPO_NAME", output_repo_name),
+                ]
+
+            if template_type == "bro":
+                replace_rules.append(("*.csproj", "BroTemplate.cs", f"{newNameNoSpaces}.cs"))
+
+                dep_versions = get_dependency_versions()
+                bromaker_version = dep_versions.get('BroMaker', '2.6.0')
+
+                replace_rules.append(("*.json", "BROMAKER_VERSION", bromaker_version))
+
+            add_rocketlib = with_rocketlib and type_info["has_code"]
+            if add_rocketlib:
+                # Insert the RocketLib reference just before UnityModManager's in the same pass
+                unity_reference = '    <Reference Include="UnityModManager">'
+                rocketlib_reference = (
                     '    <Reference Include="RocketLib">\n'
                     '      <HintPath>$(RocketLibPath)</HintPath>\n'
                     '    </Reference>\n'
                 )
-                # Insert before the closing </ItemGroup> of the Reference block
-                content = content.replace(
-                    '    <Reference Include="UnityModManager">',
-                    rocketlib_ref + '    <Reference Include="UnityModManager">',
-                )
-                with open(csproj_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                replace_rules.append(("*.csproj", unity_reference, rocketlib_reference + unity_reference))
+
+            rename_and_replace(stagedRepoPath, renames, replace_rules)
+            if add_rocketlib:
                 print(f"{Colors.GREEN}Added RocketLib reference{Colors.ENDC}")
 
-        changelogPath = os.path.join(newReleaseFolder, 'Changelog.md')
-        changelogContent = '''## v1.0.0 (unreleased)
-- Initial release
-'''
-
-        with open(changelogPath, 'w', encoding='utf-8') as changelogFile:
-            changelogFile.write(changelogContent)
-
-        print(f"\n{Colors.GREEN}{Colors.BOLD}Success! Created new {template_type} '{newName}'{Colors.ENDC}")
-        if output_repo:
-            print(f"{Colors.CYAN}Output repository:{Colors.ENDC} {output_repo_name}")
-        print(f"{Colors.CYAN}Source files:{Colors.ENDC} {newRepoPath}")
-        print(f"{Colors.CYAN}Releases folder:{Colors.ENDC} {newReleaseFolder}")
-
-        if no_thunderstore:
-            print(f"\n{Colors.CYAN}Next steps:{Colors.ENDC}")
-            if type_info["has_code"]:
-                print(f"  1. Open the project in Visual Studio")
-                print(f"  2. Build the project (builds to game automatically)")
-                print(f"  3. Launch Broforce to test your {template_type}")
-                print(f"  4. Run 'bt init-thunderstore' when ready to publish")
-            else:
-                print(f"  1. Edit the .fa.json file to set the Wearer and sprite")
-                print(f"  2. Replace placeholder.png with your sprite")
-                print(f"  3. Run 'bt init-thunderstore' when ready to publish")
-        elif non_interactive:
-            print(f"\n{Colors.CYAN}Note: Run 'bt init-thunderstore' to set up Thunderstore metadata.{Colors.ENDC}")
-        else:
-            setup_thunderstore = questionary.confirm(
-                "Set up Thunderstore metadata now?",
-                default=True
-            ).ask()
+            os.rename(stagedRepoPath, newRepoPath)
+            rollback.callback(shutil.rmtree, newRepoPath, ignore_errors=True)
+            # Drop the now-empty staging folder before any prompts, so an
+            # interrupted session never leaves it behind in the repo
+            cleanup.close()
 
-            if setup_thunderstore is None:
-                raise typer.Exit()
-            elif setup_thunderstore:
-                print()
-                new_project = Project(
-                    name=newName,
-                    repo=output_repo_name,
-                    subdir=newName,
-                    repos_parent=repos_parent,
-                    project_type=template_type,
-                )
-                do_init_thunderstore(new_project)
-            else:
+            changelogPath = os.path.join(newReleaseFolder, 'Changelog.md')
+            write_file_atomic(changelogPath, '## v1.0.0 (unreleased)\n- Initial release\n')
+
+            print(f"\n{Colors.GREEN}{Colors.BOLD}Success! Created new {template_type} '{newName}'{Colors.ENDC}")
+            if output_repo:
+                print(f"{Colors.CYAN}Output repository:{Colors.ENDC} {output_repo_name}")
+            print(f"{Colors.CYAN}Source files:{Colors.ENDC} {newRepoPath}")
+            print(f"{Colors.CYAN}Releases folder:{Colors.ENDC} {newReleaseFolder}")
+
+            if no_thunderstore:
                 print(f"\n{Colors.CYAN}Next steps:{Colors.ENDC}")
                 if type_info["has_code"]:
                     print(f"  1. Open the project in Visual Studio")
@@ -488,18 +483,49 @@ def do_create_project(
                     print(f"  1. Edit the .fa.json file to set the Wearer and sprite")
                     print(f"  2. Replace placeholder.png with your sprite")
                     print(f"  3. Run 'bt init-thunderstore' when ready to publish")
+            elif non_interactive:
+                print(f"\n{Colors.CYAN}Note: Run 'bt init-thunderstore' to set up Thunderstore metadata.{Colors.ENDC}")
+            else:
+                setup_thunderstore = questionary.confirm(
+                    "Set up Thunderstore metadata now?",
+                    default=True
+                ).ask()
 
-    except (SystemExit, click.exceptions.Exit):
-        raise
-    except Exception as e:
-        print(f"{Colors.FAIL}Error: Failed during file processing: {e}{Colors.ENDC}")
-        import traceback
-        traceback.print_exc()
-        if os.path.exists(newReleaseFolder):
-            shutil.rmtree(newReleaseFolder)
-        if os.path.exists(newRepoPath):
-            shutil.rmtree(newRepoPath)
-        raise typer.Exit(1)
+                if setup_thunderstore is None:
+                    raise typer.Exit()
+                elif setup_thunderstore:
+                    print()
+                    new_project = Project(
+                        name=newName,
+                        repo=output_repo_name,
+                        subdir=newName,
+                        repos_parent=repos_parent,
+                        project_type=template_type,
+                    )
+                    do_init_thunderstore(new_project)
+                else:
+                    print(f"\n{Colors.CYAN}Next steps:{Colors.ENDC}")
+                    if type_info["has_code"]:
+                        print(f"  1. Open the project in Visual Studio")
+                        print(f"  2. Build the project (builds to game automatically)")
+                        print(f"  3. Launch Broforce to test your {template_type}")
+                        print(f"  4. Run 'bt init-thunderstore' when ready to publish")
+                    else:
+                        print(f"  1. Edit the .fa.json file to set the Wearer and sprite")
+                        print(f"  2. Replace placeholder.png with your sprite")
+                        print(f"  3. Run 'bt init-thunderstore' when ready to publish")
+
+            rollback.pop_all()
+        except (SystemExit, click.exceptions.Exit):
+            rollback.pop_all()
+            raise
+        except Exception as e:
+            print(f"{Colors.FAIL}Error: Failed during file processing: {type(e).__name__}: {e}{Colors.ENDC}")
+            if os.environ.get('BROFORCE_VERBOSE'):
+                traceback.print_exc()
+            else:
+                print("Set BROFORCE_VERBOSE=1 to see the full traceback.")
+            raise typer.Exit(1)
 
 
 def _select_project_for_changelog(repos_parent: str) -> Optional[tuple[Project, str, str]]:
@@ -507,6 +533,8 @@ def _select_project_for_changelog(repos_parent: str) -> Optional[tuple[Project,
 
     Returns (project, releases_path, changelog_path) or None if cancelled.
     """
+    import questionary
+
     repos, _ = get_repos_to_search(repos_parent, use_all_repos=False)
     if not repos:
         print(f"{Colors.FAIL}Error: No repos configured. Use 'bt config add-repo' to add repos.{Colors.ENDC}")
@@ -570,6 +598,8 @@ def _interactive_changelog_show(repos_parent: str) -> None:
 
 def _interactive_changelog_add(repos_parent: str) -> None:
     """Add a changelog entry via interactive prompts."""
+    import questionary
+
     message = questionary.text("Enter changelog entry:").ask()
     if not message:
         raise typer.Exit()
@@ -596,9 +626,6 @@ def _interactive_changelog_add(repos_parent: str) -> None:
 
 def _interactive_changelog_edit(repos_parent: str) -> None:
     """Open a changelog in an editor via interactive project selection."""
-    import shlex
-    import subprocess
-
     result = _select_project_for_changelog(repos_parent)
     if not result:
         raise typer.Exit()
@@ -661,6 +688,8 @@ def main_callback(
     if ctx.invoked_subcommand is not None:
         return
 
+    import questionary
+
     # Interactive menu - needs repos_parent
     try:
         repos_parent = str(get_repos_parent())
@@ -842,6 +871,8 @@ def unreleased(
     package: Optional[list[str]] = typer.Option(None, "--package", help="Package specific project(s)"),
 ):
     """List projects with unreleased changes and optionally package them."""
+    import questionary
+
     init_colors()
     repos_parent = str(get_repos_parent())
 
@@ -998,7 +1029,7 @@ def deps(
     if cache_file.exists():
         try:
             with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+                cache_data = json.loads(f.read())
             fallbacks = set(cache_data.get('fallbacks', []))
         except (json.JSONDecodeError, OSError):
             pass
@@ -1013,7 +1044,7 @@ def deps(
     if cache_file.exists():
         try:
             with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+                cache_data = json.loads(f.read())
             cache_time = cache_data.get('timestamp', 0)
             age_seconds = time.time() - cache_time
             if age_seconds < 60:
@@ -1052,6 +1083,8 @@ def changelog_add(
     non_interactive: bool = typer.Option(False, "-y", "--non-interactive", help="Fail instead of prompting for input"),
 ):
     """Add an entry to a project's unreleased changelog section."""
+    import questionary
+
     init_colors()
     repos_parent = str(get_repos_parent())
 
@@ -1153,6 +1186,8 @@ def changelog_edit(
     non_interactive: bool = typer.Option(False, "-y", "--non-interactive", help="Fail instead of prompting for input"),
 ):
     """Open a project's changelog in an editor."""
+    import questionary
+
     init_colors()
     repos_parent = str(get_repos_parent())
 
@@ -1213,8 +1248,6 @@ def changelog_edit(
     editor = os.environ.get('EDITOR', os.environ.get('VISUAL', fallback))
     print(f"{Colors.CYAN}Opening {changelog_path} in {editor}...{Colors.ENDC}")
 
-    import shlex
-    import subprocess
     try:
         editor_cmd = shlex.split(editor) + [changelog_path]
         subprocess.run(editor_cmd, check=True)
@@ -1238,6 +1271,8 @@ def changelog_show(
     non_interactive: bool = typer.Option(False, "-y", "--non-interactive", help="Fail instead of prompting for input"),
 ):
     """Show the latest changelog entries for a project."""
+    import questionary
+
     init_colors()
     repos_parent = str(get_repos_parent())
 
@@ -1388,11 +1423,8 @@ def config_path():
 def config_edit():
     """Open config file in $EDITOR."""
     init_colors()
-    import shlex
-    import subprocess
     config_file = get_config_file()
     if not config_file.exists():
-        from .paths import ensure_dir
         ensure_dir(config_file.parent)
         config_file.write_text('{\n  "repos": []\n}\n')
         print(f"{Colors.GREEN}Created config file: {config_file}{Colors.ENDC}")
@@ -1521,6 +1553,8 @@ def config_init(
     non_interactive: bool = typer.Option(False, "-y", "--non-interactive", help="Fail instead of prompting for input"),
 ):
     """Interactive first-run configuration setup."""
+    import questionary
+
     init_colors()
     config_file = get_config_file()
 
@@ -1555,10 +1589,7 @@ def config_init(
         # Auto-detect repos
         expanded = os.path.expanduser(repos_parent_str)
         if os.path.isdir(expanded):
-            dirs = sorted([
-                d for d in os.listdir(expanded)
-                if os.path.isdir(os.path.join(expanded, d)) and not d.startswith('.')
-            ])
+            dirs = sorted(d for d in list_subdirs(expanded) if not d.startswith('.'))
             if dirs:
                 print(f"\n{Colors.CYAN}Found directories:{Colors.ENDC}")
                 selected = questionary.checkbox(
@@ -1602,6 +1633,8 @@ def config_init(
 
 def _interactive_config(repos_parent: Optional[str]):
     """Handle config management from the interactive menu."""
+    import questionary
+
     sub = questionary.select(
         "Configuration action:",
         choices=[
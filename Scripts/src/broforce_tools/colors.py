@@ -8,6 +8,7 @@ Color scheme:
   FAIL (red) - Errors
 """
 import locale
+import os
 import sys
 
 _colors_initialized = False
@@ -23,6 +24,16 @@ def _supports_unicode() -> bool:
         return False
 
 
+def _supports_color() -> bool:
+    """Check if stdout is a terminal that should receive ANSI escape codes."""
+    if os.environ.get('NO_COLOR'):
+        return False
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
 def init_colors() -> None:
     """Initialize console for ANSI color support on Windows."""
     global _colors_initialized
@@ -40,20 +51,26 @@ def init_colors() -> None:
 
 
 _unicode = _supports_unicode()
+_color = _supports_color()
 
 CHECK = "\u2713" if _unicode else "[OK]"
 WARNING_ICON = "\u26a0\ufe0f " if _unicode else "[!] "
 ARROW = "\u2192" if _unicode else "->"
 
 
+def _ansi(code: str) -> str:
+    """Return the escape code, or '' when output is redirected."""
+    return code if _color else ''
+
+
 class Colors:
-    """ANSI color codes."""
-    HEADER = '\033[95m'
-    BLUE = '\033[94m'
-    CYAN = '\033[96m'
-    GREEN = '\033[92m'
-    WARNING = '\033[93m'
-    FAIL = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
+    """ANSI color codes (empty strings when stdout is not a terminal)."""
+    HEADER = _ansi('\033[95m')
+    BLUE = _ansi('\033[94m')
+    CYAN = _ansi('\033[96m')
+    GREEN = _ansi('\033[92m')
+    WARNING = _ansi('\033[93m')
+    FAIL = _ansi('\033[91m')
+    ENDC = _ansi('\033[0m')
+    BOLD = _ansi('\033[1m')
+    UNDERLINE = _ansi('\033[4m')
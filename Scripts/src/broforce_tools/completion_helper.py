@@ -9,28 +9,28 @@ def main():
 
     mode = sys.argv[1]
 
-    from .config import load_config
+    from .config import get_configured_repos
     from .paths import get_repos_parent, TemplatesDirNotFound
     from .project import find_projects
 
-    config = load_config()
     try:
         repos_parent = str(get_repos_parent())
     except TemplatesDirNotFound:
         return
-    repos = config.get('repos', [])
+    repos = get_configured_repos()
 
     if mode == 'repos':
-        for repo in repos:
-            print(repo)
+        names = repos
     elif mode == 'init':
-        projects = find_projects(repos_parent, repos, exclude_with_metadata=True)
-        for project in projects:
-            print(project.name)
+        names = [p.name for p in find_projects(repos_parent, repos, exclude_with_metadata=True)]
     elif mode == 'package':
-        projects = find_projects(repos_parent, repos, require_metadata=True)
-        for project in projects:
-            print(project.name)
+        names = [p.name for p in find_projects(repos_parent, repos, require_metadata=True)]
+    else:
+        return
+
+    # One write for the whole list; the shell reads it back line by line
+    if names:
+        sys.stdout.write('\n'.join(names) + '\n')
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 """Configuration management for broforce-tools."""
+import copy
 import json
 import shutil
 from pathlib import Path
@@ -11,6 +12,9 @@ CONFIG_FILE_NAME = 'config.json'
 NIX_CONFIG_FILE_NAME = 'config.nix.json'
 CACHE_FILE_NAME = 'dependency_cache.json'
 
+# Parsed config, keyed on the path and stat signature of both config layers.
+_config_cache: dict = {'key': None, 'data': None}
+
 
 def get_config_file() -> Path:
     """Get path to user config file (imperative, written by bt config commands)."""
@@ -53,11 +57,20 @@ def _load_json_file(path: Path) -> Optional[dict]:
         return None
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            return json.loads(f.read())
     except (json.JSONDecodeError, OSError):
         return None
 
 
+def _file_signature(path: Path) -> Optional[tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it cannot be stat'ed."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 def _merge_configs(base: dict, override: dict) -> dict:
     """Merge two config dicts. Override values take precedence.
 
@@ -88,10 +101,31 @@ def load_config() -> dict:
     - 'repos_parent': path to parent directory containing repos
     - 'release_dir': path to central directory for release zip copies
     """
+    # Callers mutate the result before saving, so never hand out the cached dict
+    return copy.deepcopy(_cached_config())
+
+
+def _cached_config() -> dict:
+    """Return the shared parsed config, re-reading only when a layer changed on disk.
+
+    The result must not be mutated; the read-only getters below use it to
+    avoid copying the whole config on every call.
+    """
     _migrate_old_windows_config()
 
-    nix_config = _load_json_file(get_nix_config_file())
-    user_config = _load_json_file(get_config_file())
+    nix_file = get_nix_config_file()
+    user_file = get_config_file()
+    key = (str(nix_file), _file_signature(nix_file), str(user_file), _file_signature(user_file))
+    if _config_cache['key'] != key:
+        _config_cache['data'] = _read_config(nix_file, user_file)
+        _config_cache['key'] = key
+    return _config_cache['data']
+
+
+def _read_config(nix_file: Path, user_file: Path) -> dict:
+    """Read and merge both config layers from disk."""
+    nix_config = _load_json_file(nix_file)
+    user_config = _load_json_file(user_file)
 
     if nix_config and user_config:
         return _merge_configs(nix_config, user_config)
@@ -104,10 +138,11 @@ def load_config() -> dict:
 
 def save_config(config: dict) -> bool:
     """Save configuration to config file."""
+    _config_cache['key'] = None
     try:
         ensure_dir(get_config_dir())
         with open(get_config_file(), 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+            f.write(json.dumps(config, indent=2))
         return True
     except OSError:
         return False
@@ -115,27 +150,23 @@ def save_config(config: dict) -> bool:
 
 def get_configured_repos() -> list[str]:
     """Get list of configured repos."""
-    config = load_config()
-    return config.get('repos', [])
+    return list(_cached_config().get('repos', []))
 
 
 def get_ignored_projects(repo_name: str) -> list[str]:
     """Get list of ignored project names for a repo."""
-    config = load_config()
-    ignore_config = config.get('ignore', {})
-    return ignore_config.get(repo_name, [])
+    ignore_config = _cached_config().get('ignore', {})
+    return list(ignore_config.get(repo_name, []))
 
 
 def get_defaults() -> dict:
     """Get default values for namespace and website_url."""
-    config = load_config()
-    return config.get('defaults', {})
+    return dict(_cached_config().get('defaults', {}))
 
 
 def get_release_dir() -> Optional[str]:
     """Get the central release directory path, if configured."""
-    config = load_config()
-    release_dir = config.get('release_dir')
+    release_dir = _cached_config().get('release_dir')
     if release_dir:
         return str(Path(release_dir).expanduser())
     return None
@@ -3,6 +3,7 @@
 On Linux: Uses XDG directories (~/.config/broforce-tools/, ~/.cache/broforce-tools/)
 On Windows: Uses %APPDATA%/broforce-tools for config, temp for cache
 """
+import functools
 import os
 import sys
 import tempfile
@@ -128,6 +129,7 @@ def get_repos_parent() -> Path:
     return get_templates_dir().parent
 
 
+@functools.lru_cache(maxsize=1)
 def _get_bundled_templates_dir() -> Optional[Path]:
     """Get path to templates bundled inside the package (for pipx installs)."""
     bundled = Path(__file__).parent / 'templates'
@@ -136,14 +138,23 @@ def _get_bundled_templates_dir() -> Optional[Path]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def _get_script_dir() -> Path:
     """Get the directory containing this script/package.
 
     Used as fallback for templates when running from within the repo.
+    Cached, since it is constant per process and completion calls it on
+    every keystroke.
     """
     return Path(__file__).parent.parent.parent
 
 
+def list_subdirs(path: str) -> list[str]:
+    """List the names of subdirectories of path with a single scandir pass."""
+    with os.scandir(path) as it:
+        return [entry.name for entry in it if entry.is_dir()]
+
+
 def ensure_dir(path: Path) -> None:
     """Create directory if it doesn't exist."""
     path.mkdir(parents=True, exist_ok=True)
@@ -10,6 +10,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from .config import get_configured_repos, get_ignored_projects
+from .paths import list_subdirs
 from .project_types import PROJECT_TYPES, get_all_metadata_patterns
 
 
@@ -29,6 +30,8 @@ class Project:
         project_type: Detected type ("mod", "bro", "wardrobe") or None.
         metadata_dir: Full path to the metadata directory (_ModContent etc.) or None.
         has_thunderstore_metadata: Whether manifest.json exists in the releases path.
+        repo_project_count: Number of projects in the repo, as counted during
+            discovery, or None if not yet known.
     """
     name: str
     repo: str
@@ -37,6 +40,7 @@ class Project:
     project_type: Optional[str] = field(default=None, compare=False, repr=False)
     metadata_dir: Optional[str] = field(default=None, compare=False, repr=False)
     has_thunderstore_metadata: bool = field(default=False, compare=False, repr=False)
+    repo_project_count: Optional[int] = field(default=None, compare=False, repr=False)
 
     @property
     def project_dir(self) -> str:
@@ -58,26 +62,30 @@ class Project:
     def get_releases_path(self, create: bool = False) -> Optional[str]:
         """Get the releases path for this project.
 
-        Delegates to the module-level get_releases_path() function.
+        Delegates to the module-level get_releases_path() function, reusing
+        the project count recorded by find_projects() when available.
         """
-        return get_releases_path(self.repos_parent, self.repo, self.name, create=create)
+        return get_releases_path(
+            self.repos_parent, self.repo, self.name, create=create,
+            _project_count=self.repo_project_count,
+        )
 
 
 # ---------------------------------------------------------------------------
 # Metadata detection
 # ---------------------------------------------------------------------------
 
+def _matches_any(names: list[str], patterns: list[str]) -> bool:
+    """Check if any name matches any of the glob patterns."""
+    return any(fnmatch.filter(names, pattern) for pattern in patterns)
+
+
 def _has_mod_metadata(dir_path: str) -> bool:
     """Check if a directory contains valid project metadata."""
-    patterns = get_all_metadata_patterns()
     try:
-        for f in os.listdir(dir_path):
-            for pattern in patterns:
-                if fnmatch.fnmatch(f, pattern):
-                    return True
+        return _matches_any(os.listdir(dir_path), get_all_metadata_patterns())
     except (OSError, FileNotFoundError):
-        pass
-    return False
+        return False
 
 
 def find_mod_metadata_dir(project_path: str) -> Optional[str]:
@@ -88,18 +96,31 @@ def find_mod_metadata_dir(project_path: str) -> Optional[str]:
     """
     skip_dirs = {'bin', 'obj', '.vs', 'packages', 'Properties'}
 
-    for root, dirs, files in os.walk(project_path):
-        depth = root[len(project_path):].count(os.sep)
-        if depth > 3:
-            dirs.clear()
-            continue
+    # Same order as a top-down os.walk limited to depth 3, but child paths come
+    # straight from DirEntry.path instead of os.path.join per directory
+    def search(dir_path: str, depth: int) -> Optional[str]:
+        try:
+            with os.scandir(dir_path) as it:
+                subdirs = [entry for entry in it if entry.name not in skip_dirs and entry.is_dir()]
+        except OSError:
+            return None
+
+        for entry in subdirs:
+            if _has_mod_metadata(entry.path):
+                return entry.path
 
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        if depth < 3:
+            for entry in subdirs:
+                if entry.is_symlink():
+                    continue
+                found = search(entry.path, depth + 1)
+                if found:
+                    return found
+        return None
 
-        for d in dirs:
-            dir_path = os.path.join(root, d)
-            if _has_mod_metadata(dir_path):
-                return dir_path
+    found = search(project_path, 0)
+    if found:
+        return found
 
     if _has_mod_metadata(project_path):
         return project_path
@@ -120,16 +141,24 @@ def detect_project_type(project_path: str) -> Optional[str]:
     metadata_dir = find_mod_metadata_dir(project_path)
     if not metadata_dir:
         return None
+    return detect_metadata_dir_type(metadata_dir)
+
 
+def detect_metadata_dir_type(metadata_dir: str) -> Optional[str]:
+    """Detect project type from an already located metadata directory.
+
+    Lets callers that also need the metadata dir avoid a second
+    find_mod_metadata_dir() walk.
+    """
     try:
-        for f in os.listdir(metadata_dir):
-            for type_key, type_info in PROJECT_TYPES.items():
-                for pattern in type_info["metadata_patterns"]:
-                    if fnmatch.fnmatch(f, pattern):
-                        return type_key
+        names = os.listdir(metadata_dir)
     except (OSError, FileNotFoundError):
         return None
 
+    for type_key, type_info in PROJECT_TYPES.items():
+        if _matches_any(names, type_info["metadata_patterns"]):
+            return type_key
+
     return None
 
 
@@ -137,6 +166,20 @@ def detect_project_type(project_path: str) -> Optional[str]:
 # Project discovery
 # ---------------------------------------------------------------------------
 
+def _candidate_dirs(path: str) -> list[os.DirEntry]:
+    """List subdirectories of path that may hold projects, in one scandir pass.
+
+    Raises OSError if path cannot be read.
+    """
+    with os.scandir(path) as it:
+        return [
+            entry for entry in it
+            if not entry.name.startswith(('.', '_'))
+            and entry.name not in SKIP_DIRS
+            and entry.is_dir()
+        ]
+
+
 def _is_direct_project(path: str) -> bool:
     """Check if a directory is itself a project.
 
@@ -154,44 +197,29 @@ def _is_direct_project(path: str) -> bool:
     all_patterns = get_all_metadata_patterns() + ["*.csproj"]
     metadata_only = get_all_metadata_patterns()
 
-    # Check depth 0: files directly in the directory
+    # One scandir gives both the depth-0 file names and the subdirectories
     try:
-        for f in os.listdir(path):
-            for pattern in all_patterns:
-                if fnmatch.fnmatch(f, pattern):
-                    return True
-    except (OSError, FileNotFoundError):
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
         return False
 
-    # Check depth 1: same-named subdirectory gets the full check (csproj + metadata)
-    inner = os.path.join(path, name)
-    if os.path.isdir(inner):
+    # Check depth 0: files directly in the directory
+    if _matches_any([e.name for e in entries], all_patterns):
+        return True
+
+    # Check depth 1: same-named subdirectory gets the full check (csproj + metadata),
+    # other subdirectories only match metadata (not .csproj)
+    for entry in entries:
+        if not entry.is_dir():
+            continue
+        patterns = all_patterns if entry.name == name else metadata_only
         try:
-            for f in os.listdir(inner):
-                for pattern in all_patterns:
-                    if fnmatch.fnmatch(f, pattern):
-                        return True
-        except (OSError, FileNotFoundError):
+            if _matches_any(os.listdir(entry.path), patterns):
+                return True
+        except OSError:
             pass
 
-    # Check depth 1: other subdirectories only match metadata (not .csproj)
-    try:
-        for d in os.listdir(path):
-            if d == name:
-                continue
-            d_path = os.path.join(path, d)
-            if not os.path.isdir(d_path):
-                continue
-            try:
-                for f in os.listdir(d_path):
-                    for pattern in metadata_only:
-                        if fnmatch.fnmatch(f, pattern):
-                            return True
-            except (OSError, FileNotFoundError):
-                pass
-    except (OSError, FileNotFoundError):
-        pass
-
     return False
 
 
@@ -201,18 +229,24 @@ def _discover_in_directory(
     repo: str,
     repos_parent: str,
     ignored_projects: list[str],
+    name_prefix: Optional[str] = None,
 ) -> list[Project]:
     """Discover projects in a single top-level directory.
 
     If the directory is a direct project, returns it as a single Project.
     If it's a group folder (not a project itself, but contains project subdirs),
     returns each child project with subdir set to "group/child".
+
+    name_prefix (lowercase) skips projects whose name doesn't start with it
+    before their metadata is searched for.
     """
     if _is_direct_project(item_path):
         if item in ignored_projects:
             return []
-        project_type = detect_project_type(item_path)
+        if name_prefix and not item.lower().startswith(name_prefix):
+            return []
         metadata_dir = find_mod_metadata_dir(item_path)
+        project_type = detect_metadata_dir_type(metadata_dir) if metadata_dir else None
         return [Project(
             name=item,
             repo=repo,
@@ -225,17 +259,16 @@ def _discover_in_directory(
     # Not a direct project — check for group (children that are projects)
     children = []
     try:
-        for child in os.listdir(item_path):
-            if child.startswith('.') or child.startswith('_') or child in SKIP_DIRS:
-                continue
-            child_path = os.path.join(item_path, child)
-            if not os.path.isdir(child_path):
+        for entry in _candidate_dirs(item_path):
+            child = entry.name
+            child_path = entry.path
+            if name_prefix and not child.lower().startswith(name_prefix):
                 continue
             if _is_direct_project(child_path):
                 if child in ignored_projects:
                     continue
-                project_type = detect_project_type(child_path)
                 metadata_dir = find_mod_metadata_dir(child_path)
+                project_type = detect_metadata_dir_type(metadata_dir) if metadata_dir else None
                 children.append(Project(
                     name=child,
                     repo=repo,
@@ -255,6 +288,7 @@ def find_projects(
     repos: list[str],
     require_metadata: bool = False,
     exclude_with_metadata: bool = False,
+    name_prefix: Optional[str] = None,
 ) -> list['Project']:
     """Find projects in the given repos.
 
@@ -266,12 +300,16 @@ def find_projects(
         repos: List of repo names to search
         require_metadata: If True, only return projects WITH Thunderstore metadata
         exclude_with_metadata: If True, only return projects WITHOUT Thunderstore metadata
+        name_prefix: If set, only return projects whose name starts with it
+            (case-insensitive); used by shell completion to skip the rest early
 
     Returns:
         List of Project objects, sorted by name.
     """
     projects: list[Project] = []
     seen_dirs: set[str] = set()
+    if name_prefix:
+        name_prefix = name_prefix.lower()
 
     for repo in repos:
         ignored_projects = get_ignored_projects(repo)
@@ -279,19 +317,14 @@ def find_projects(
         if not os.path.exists(repo_path):
             continue
 
-        project_count = count_projects_in_repo(repos_parent, repo)
+        # Counted on the first match, so a completion prefix that matches
+        # nothing in this repo skips the full-repo scan
+        project_count = None
 
         try:
-            for item in os.listdir(repo_path):
-                if item.startswith('.') or item.startswith('_') or item in SKIP_DIRS:
-                    continue
-
-                item_path = os.path.join(repo_path, item)
-                if not os.path.isdir(item_path):
-                    continue
-
+            for entry in _candidate_dirs(repo_path):
                 discovered = _discover_in_directory(
-                    item, item_path, repo, repos_parent, ignored_projects,
+                    entry.name, entry.path, repo, repos_parent, ignored_projects, name_prefix,
                 )
 
                 for project in discovered:
@@ -300,9 +333,14 @@ def find_projects(
                         continue
                     seen_dirs.add(real_dir)
 
-                    project.has_thunderstore_metadata = _project_has_metadata(
-                        repos_parent, repo, project.name,
-                        _project_count=project_count,
+                    if project_count is None:
+                        project_count = count_projects_in_repo(repos_parent, repo)
+                        is_multi = project_count > 1
+                        repo_has_manifest, manifest_projects = _manifest_index(repo_path, is_multi)
+
+                    project.repo_project_count = project_count
+                    project.has_thunderstore_metadata = (
+                        os.path.normcase(project.name) in manifest_projects if is_multi else repo_has_manifest
                     )
                     if require_metadata and not project.has_thunderstore_metadata:
                         continue
@@ -329,10 +367,7 @@ def find_project_by_name(
     if repos is None:
         repos = get_configured_repos()
         if not repos:
-            repos = [
-                d for d in os.listdir(repos_parent)
-                if os.path.isdir(os.path.join(repos_parent, d))
-            ]
+            repos = list_subdirs(repos_parent)
 
     all_projects = find_projects(repos_parent, repos)
     for project in all_projects:
@@ -353,24 +388,14 @@ def count_projects_in_repo(repos_parent: str, repo: str) -> int:
         return 0
 
     try:
-        for item in os.listdir(repo_path):
-            if item.startswith('.') or item.startswith('_') or item in SKIP_DIRS:
-                continue
-
-            item_path = os.path.join(repo_path, item)
-            if not os.path.isdir(item_path):
-                continue
-
-            if _is_direct_project(item_path):
+        for entry in _candidate_dirs(repo_path):
+            if _is_direct_project(entry.path):
                 count += 1
             else:
                 # Check for group children
                 try:
-                    for child in os.listdir(item_path):
-                        if child.startswith('.') or child.startswith('_') or child in SKIP_DIRS:
-                            continue
-                        child_path = os.path.join(item_path, child)
-                        if os.path.isdir(child_path) and _is_direct_project(child_path):
+                    for child in _candidate_dirs(entry.path):
+                        if _is_direct_project(child.path):
                             count += 1
                 except (OSError, FileNotFoundError):
                     pass
@@ -400,24 +425,28 @@ def get_releases_path(
     repo_path = os.path.join(repos_parent, repo)
     releases_dir = os.path.join(repo_path, 'Releases')
     release_dir = os.path.join(repo_path, 'Release')
+    # Probe the release folders first: without either one there is nothing to
+    # find, and the project count (a scan of the whole repo) can be skipped
+    existing = [folder for folder in (releases_dir, release_dir) if os.path.isdir(folder)]
+
+    if not create and not existing:
+        return None
 
     project_count = _project_count if _project_count is not None else count_projects_in_repo(repos_parent, repo)
     is_multi = project_count > 1
 
     if not create:
-        for folder in [releases_dir, release_dir]:
+        for folder in existing:
             if is_multi:
                 path = os.path.join(folder, project_name)
             else:
                 path = folder
-            if os.path.exists(os.path.join(path, 'manifest.json')):
+            if os.path.isfile(os.path.join(path, 'manifest.json')):
                 return path
         return None
 
-    if os.path.exists(releases_dir) and os.path.isdir(releases_dir):
-        base_folder = releases_dir
-    elif os.path.exists(release_dir) and os.path.isdir(release_dir):
-        base_folder = release_dir
+    if existing:
+        base_folder = existing[0]
     else:
         base_folder = releases_dir if is_multi else release_dir
 
@@ -427,18 +456,41 @@ def get_releases_path(
         return base_folder
 
 
-def _project_has_metadata(
-    repos_parent: str, repo: str, project_name: str,
-    _project_count: Optional[int] = None,
-) -> bool:
-    """Check if a project has Thunderstore metadata (manifest.json)."""
-    return get_releases_path(repos_parent, repo, project_name, create=False, _project_count=_project_count) is not None
+def _manifest_index(repo_path: str, is_multi: bool) -> tuple[bool, set[str]]:
+    """Index which projects in a repo have Thunderstore metadata (manifest.json).
+
+    Mirrors get_releases_path(create=False), but scans the Releases/Release
+    folders once per repo so find_projects() can answer each project with a
+    set lookup. Returns (repo_has_manifest, project_names_with_manifest); the
+    first applies to single-project repos, the second to multi-project repos.
+    Names are os.path.normcase'd, matching the filesystem's own case rules.
+    """
+    names: set[str] = set()
+    for folder in (os.path.join(repo_path, 'Releases'), os.path.join(repo_path, 'Release')):
+        if not is_multi:
+            if os.path.isfile(os.path.join(folder, 'manifest.json')):
+                return True, names
+            continue
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    name = os.path.normcase(entry.name)
+                    if (name not in names and entry.is_dir()
+                            and os.path.isfile(entry.path + os.sep + 'manifest.json')):
+                        names.add(name)
+        except OSError:
+            continue
+    return False, names
 
 
 # ---------------------------------------------------------------------------
 # Repo detection
 # ---------------------------------------------------------------------------
 
+_WINDOWS_DRIVE_RE = re.compile(r'^([a-z]):/(.*)')
+_WSL_DRIVE_RE = re.compile(r'^/mnt/([a-z])/(.*)')
+
+
 def _normalize_wsl_path(path: str) -> tuple[str, Optional[str]]:
     """Normalize a path for WSL/Windows cross-compatibility.
 
@@ -446,67 +498,41 @@ def _normalize_wsl_path(path: str) -> tuple[str, Optional[str]]:
     and alt uses X:/ format (or None if not a drive path).
     """
     alt = None
-    match = re.match(r'^([a-z]):/(.*)', path)
+    match = _WINDOWS_DRIVE_RE.match(path)
     if match:
         path = f'/mnt/{match.group(1)}/{match.group(2)}'
     else:
-        match = re.match(r'^/mnt/([a-z])/(.*)', path)
+        match = _WSL_DRIVE_RE.match(path)
         if match:
             alt = f'{match.group(1)}:/{match.group(2)}'
     return path, alt
 
 
-def detect_current_repo(repos_parent: str) -> Optional[str]:
-    """Detect which repo we're currently in based on cwd."""
-    cwd = os.getcwd()
+def _comparable_path(path: str) -> str:
+    """Absolute, lowercased, forward-slash form of path with drives as /mnt/X/."""
+    normalized, _ = _normalize_wsl_path(os.path.abspath(path).replace('\\', '/').lower())
+    return normalized.rstrip('/')
 
-    cwd_original = os.path.abspath(cwd).replace('\\', '/')
-    repos_original = os.path.abspath(repos_parent).replace('\\', '/')
 
-    cwd_abs, cwd_abs_alt = _normalize_wsl_path(cwd_original.lower())
-    repos_abs, repos_abs_alt = _normalize_wsl_path(repos_original.lower())
+def detect_current_repo(repos_parent: str) -> Optional[str]:
+    """Detect which repo we're currently in based on cwd."""
+    cwd = _comparable_path(os.getcwd())
+    parent = _comparable_path(repos_parent)
+    if not cwd.startswith(parent + '/'):
+        return None
 
-    cwd_orig_normalized, _ = _normalize_wsl_path(cwd_original.lower())
-    repos_orig_normalized, _ = _normalize_wsl_path(repos_original.lower())
+    repo_name = cwd[len(parent) + 1:].split('/', 1)[0]
 
+    # Resolve the on-disk casing of the repo directory
     try:
-        is_inside = False
-        rel_path_lower = None
-        rel_path_original = None
-
-        if cwd_abs.startswith(repos_abs):
-            is_inside = True
-            rel_path_lower = cwd_abs[len(repos_abs):].lstrip('/')
-            if cwd_orig_normalized.startswith(repos_orig_normalized):
-                rel_path_original = cwd_original[len(repos_original):].lstrip('/')
-        elif cwd_abs_alt and repos_abs_alt and cwd_abs_alt.startswith(repos_abs_alt):
-            is_inside = True
-            rel_path_lower = cwd_abs_alt[len(repos_abs_alt):].lstrip('/')
-
-        if not is_inside or not rel_path_lower:
-            return None
-
-        if rel_path_original:
-            repo_name = rel_path_original.split('/')[0]
-        else:
-            repo_name = rel_path_lower.split('/')[0]
-
-        if not repo_name:
-            return None
-
-        try:
-            actual_dirs = os.listdir(repos_parent)
-            for dir_name in actual_dirs:
-                if dir_name.lower() == repo_name.lower():
-                    repo_path = os.path.join(repos_parent, dir_name)
-                    if os.path.isdir(repo_path):
-                        return dir_name
-        except (OSError, FileNotFoundError):
-            pass
+        with os.scandir(repos_parent) as it:
+            for entry in it:
+                if entry.name.lower() == repo_name and entry.is_dir():
+                    return entry.name
+    except OSError:
+        pass
 
-        return None
-    except (ValueError, OSError):
-        return None
+    return None
 
 
 def get_repos_to_search(
@@ -1,40 +1,123 @@
 """Template file operations and props file parsing."""
 import errno
 import fnmatch
+import functools
+import hashlib
+import mmap
 import os
+import re
 import shutil
 import stat
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from .colors import Colors
 
 
+# Visual Studio per-user state that should never be copied out of a template
+VS_USER_FILE_PATTERNS = ('.vs', '*.suo', '*.user')
+_IGNORE_VS_USER_FILES = shutil.ignore_patterns(*VS_USER_FILE_PATTERNS)
+
+# Files at least this large are searched for placeholders through mmap before being read
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def _chmod_writable(path: str, mode: int) -> None:
+    """Add the owner write bit unless it is already set."""
+    if not mode & stat.S_IWUSR:
+        os.chmod(path, mode | stat.S_IWUSR)
+
 
 def _make_writable(path: str) -> None:
-    """Make all files and directories in a tree writable."""
+    """Make all files and directories in a tree writable.
+
+    Walks with scandir and only chmods entries that lack the write bit, so a
+    tree copied from ordinary (writable) templates costs no chmod calls.
+    """
     # Make the root directory writable first
-    os.chmod(path, os.stat(path).st_mode | stat.S_IWUSR)
-    for root, dirs, files in os.walk(path):
-        for d in dirs:
-            dir_path = os.path.join(root, d)
-            os.chmod(dir_path, os.stat(dir_path).st_mode | stat.S_IWUSR)
-        for f in files:
-            file_path = os.path.join(root, f)
-            os.chmod(file_path, os.stat(file_path).st_mode | stat.S_IWUSR)
+    _chmod_writable(path, os.stat(path).st_mode)
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                _chmod_writable(entry.path, entry.stat().st_mode)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+
+
+# copy_file_range errors that mean "not supported here", not a real failure
+_COPY_FILE_RANGE_UNSUPPORTED = (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ETXTBSY)
+
+
+def copy_file(src: str, dst: str) -> str:
+    """Copy a file and its metadata like shutil.copy2.
+
+    Uses os.copy_file_range where available so the kernel copies the data
+    directly (a reflink on CoW filesystems like btrfs), falling back to
+    shutil.copy2 when the filesystem doesn't support it.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+        except OSError as exc:
+            if exc.errno not in _COPY_FILE_RANGE_UNSUPPORTED:
+                raise
+        else:
+            shutil.copystat(src, dst)
+            return dst
+    return shutil.copy2(src, dst)
+
+
+def _copytree_parallel(src: str, dst: str) -> None:
+    """copytree with the file copies spread over a small thread pool.
+
+    The directory skeleton is created up front and directory metadata is
+    only copied once every file has landed, so read-only template
+    directories don't lock out the pending copies. Failures are collected
+    into one shutil.Error like copytree's own.
+    """
+    dirs = []
+    copies = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        stack = [(src, dst)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            with os.scandir(src_dir) as it:
+                entries = list(it)
+            os.makedirs(dst_dir, exist_ok=True)
+            dirs.append((src_dir, dst_dir))
+            ignored = _IGNORE_VS_USER_FILES(src_dir, [entry.name for entry in entries])
+            for entry in entries:
+                if entry.name in ignored:
+                    continue
+                dst_path = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    stack.append((entry.path, dst_path))
+                else:
+                    copies.append((entry.path, dst_path, pool.submit(copy_file, entry.path, dst_path)))
+
+    for src_file, dst_file, copy in copies:
+        try:
+            copy.result()
+        except OSError as why:
+            errors.append((src_file, dst_file, str(why)))
+    # Children before parents, matching copytree's post-order copystat
+    for src_dir, dst_dir in reversed(dirs):
+        try:
+            shutil.copystat(src_dir, dst_dir)
+        except OSError as why:
+            errors.append((src_dir, dst_dir, str(why)))
+    if errors:
+        raise shutil.Error(errors)
 
 
 def copyanything(src: str, dst: str) -> None:
     """Copy directory tree, ignoring VS user-specific files."""
-    def ignore_patterns(path, names):
-        ignored = []
-        for name in names:
-            if name == '.vs' or name.endswith('.suo') or name.endswith('.user'):
-                ignored.append(name)
-        return ignored
-
     try:
-        shutil.copytree(src, dst, ignore=ignore_patterns, dirs_exist_ok=True)
+        _copytree_parallel(src, dst)
         _make_writable(dst)
     except OSError as exc:
         if exc.errno in (errno.ENOTDIR, errno.EINVAL):
@@ -44,36 +127,157 @@ def copyanything(src: str, dst: str) -> None:
             raise
 
 
+@functools.lru_cache(maxsize=16)
+def _file_digest(path: str, mtime_ns: int, size: int) -> bytes:
+    """Hash a file's contents; mtime_ns and size key the cache to this version of it."""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read()).digest()
+
+
+def same_file_contents(path_a: str, path_b: str) -> bool:
+    """Check whether two files have identical contents.
+
+    Files of different sizes are rejected from stat alone; otherwise the
+    digests are compared, and a template's digest is only computed once.
+    """
+    try:
+        stat_a = os.stat(path_a)
+        stat_b = os.stat(path_b)
+    except OSError:
+        return False
+    if stat_a.st_size != stat_b.st_size:
+        return False
+    return (_file_digest(path_a, stat_a.st_mtime_ns, stat_a.st_size)
+            == _file_digest(path_b, stat_b.st_mtime_ns, stat_b.st_size))
+
+
 def find_replace(directory: str, find: str, replace: str, file_pattern: str) -> None:
     """Find and replace text in files matching pattern."""
-    for path, dirs, files in os.walk(os.path.abspath(directory)):
-        for filename in fnmatch.filter(files, file_pattern):
-            filepath = os.path.join(path, filename)
-            with open(filepath, encoding='utf-8') as f:
-                s = f.read()
-            s = s.replace(find, replace)
-            with open(filepath, "w", encoding='utf-8') as f:
-                f.write(s)
+    find_replace_many(directory, [(file_pattern, find, replace)])
+
+
+def find_replace_many(directory: str, rules: list[tuple[str, str, str]]) -> None:
+    """Apply several find/replace rules in one walk of directory.
+
+    Each rule is (file_pattern, find, replace). The rules whose pattern matches
+    a file's name are combined into one regex alternation, so each file is
+    read, scanned and (only if something changed) written once. Matches are
+    replaced simultaneously: the longest find wins at each position, the
+    first rule wins for a repeated find, and replaced text is not rescanned.
+    """
+    rename_and_replace(directory, [], rules)
 
 
 def rename_files(directory: str, find: str, replace: str) -> None:
-    """Rename files and directories matching pattern."""
-    for path, dirs, files in os.walk(os.path.abspath(directory)):
-        for filename in fnmatch.filter(files, find + '.*'):
-            filepath = os.path.join(path, filename)
-            os.rename(filepath, os.path.join(path, replace) + '.' + filename.partition('.')[2])
-        for dir in dirs:
-            filepath = os.path.join(path, dir)
-            if dir == find:
-                os.rename(filepath, os.path.join(path, replace))
-                rename_files(os.path.join(path, replace), find, replace)
-            else:
-                rename_files(filepath, find, replace)
+    """Rename files and directories matching pattern.
+
+    Files named find.<ext> become replace.<ext>; directories named exactly
+    find become replace.
+    """
+    rename_and_replace(directory, [(find, replace)], [])
+
+
+def _name_matcher(pattern: str):
+    """Compile a glob like fnmatch.fnmatch, for names already passed through normcase."""
+    return re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+
+
+def _rewrite_file(filepath: str, needles: re.Pattern, mapping: dict[bytes, bytes]) -> None:
+    """Substitute every placeholder in a file, writing it only if it changed.
+
+    Works on the raw bytes, so line endings, BOMs and non-UTF-8 content are
+    kept as they are. Large files are searched through mmap first, so ones
+    without placeholders are never read into memory.
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if needles.search(mm) is None:
+                    return
+        data = f.read()
+    new_data = needles.sub(lambda m: mapping[m.group(0)], data)
+    if new_data != data:
+        with open(filepath, 'wb') as f:
+            f.write(new_data)
+
+
+def rename_and_replace(
+    directory: str,
+    renames: list[tuple[str, str]],
+    rules: list[tuple[str, str, str]],
+) -> None:
+    """Rename template files/directories and rewrite their contents in one walk.
+
+    renames are (find, replace) pairs with rename_files semantics, applied in
+    order; rules are find_replace_many rules, matched against the file's new
+    name. Files are renamed during the bottom-up walk and rewritten on a small
+    thread pool; directories are renamed once the rewrites have finished.
+    """
+    # Globs are compiled and names normcased once, not on every fnmatch call
+    pattern_matchers = [(pattern, _name_matcher(pattern)) for pattern in {pattern for pattern, _, _ in rules}]
+    file_renames = [(_name_matcher(find + '.*'), len(find), replace) for find, replace in renames]
+    # Matched pattern set -> (alternation over the UTF-8 finds, find -> replace)
+    compiled: dict[frozenset, tuple[re.Pattern, dict[bytes, bytes]]] = {}
+    # Directory renames wait until every rewrite is done so no queued path goes stale
+    dir_renames: list[tuple[str, str]] = []
+    rewrites = []
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for path, dirs, files in os.walk(os.path.abspath(directory), topdown=False):
+            prefix = path + os.sep
+            for filename in files:
+                new_filename = filename
+                for match, find_len, replace in file_renames:
+                    if match(os.path.normcase(new_filename)):
+                        # Keep everything after the matched name, e.g. '.Designer.cs'
+                        new_filename = replace + new_filename[find_len:]
+                filepath = prefix + new_filename
+                if new_filename != filename:
+                    os.rename(prefix + filename, filepath)
+
+                name_key = os.path.normcase(new_filename)
+                matched = frozenset(pattern for pattern, match in pattern_matchers if match(name_key))
+                if not matched:
+                    continue
+                if matched not in compiled:
+                    mapping: dict[bytes, bytes] = {}
+                    for pattern, find, replace in rules:
+                        if pattern in matched and find:
+                            mapping.setdefault(find.encode('utf-8'), replace.encode('utf-8'))
+                    needles = re.compile(b'|'.join(re.escape(find) for find in sorted(mapping, key=len, reverse=True)))
+                    compiled[matched] = (needles, mapping)
+                needles, mapping = compiled[matched]
+                if mapping:
+                    rewrites.append(pool.submit(_rewrite_file, filepath, needles, mapping))
+
+            for dirname in dirs:
+                new_dirname = dirname
+                for find, replace in renames:
+                    if new_dirname == find:
+                        new_dirname = replace
+                if new_dirname != dirname:
+                    dir_renames.append((prefix + dirname, prefix + new_dirname))
+
+        # Re-raise the first failed rewrite
+        for rewrite in rewrites:
+            rewrite.result()
+
+    # Recorded bottom-up, so each directory is renamed before its parent
+    for old_path, new_path in dir_renames:
+        os.rename(old_path, new_path)
 
 
 def find_props_file(start_dir: str, filename: str) -> Optional[str]:
-    """Search for a props file in current dir and parents."""
-    search_dir = os.path.abspath(start_dir)
+    """Search for a props file in current dir and parents.
+
+    Results are memoized per (absolute start dir, filename) for the life
+    of the process.
+    """
+    return _find_props_file_cached(os.path.abspath(start_dir), filename)
+
+
+@functools.lru_cache(maxsize=32)
+def _find_props_file_cached(search_dir: str, filename: str) -> Optional[str]:
     while True:
         props_path = os.path.join(search_dir, filename)
         if os.path.exists(props_path):
@@ -85,22 +289,24 @@ def find_props_file(start_dir: str, filename: str) -> Optional[str]:
 
 
 def parse_props_file(props_file: str, property_name: str) -> Optional[str]:
-    """Extract a property value from props file."""
-    try:
-        tree = ET.parse(props_file)
-        root = tree.getroot()
+    """Extract a property value from props file.
 
-        ns = {'msbuild': 'http://schemas.microsoft.com/developer/msbuild/2003'}
+    Streams the file and stops at the first non-empty match inside a
+    PropertyGroup, with or without the msbuild namespace.
+    """
+    import xml.etree.ElementTree as ET
 
-        for prop_group in root.findall('.//msbuild:PropertyGroup', ns):
-            prop = prop_group.find(f'.//msbuild:{property_name}', ns)
-            if prop is not None and prop.text:
-                return prop.text.strip()
-
-        for prop_group in root.findall('.//PropertyGroup'):
-            prop = prop_group.find(f'.//{property_name}')
-            if prop is not None and prop.text:
-                return prop.text.strip()
+    try:
+        group_depth = 0
+        with open(props_file, 'rb') as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                tag = elem.tag.rpartition('}')[2]
+                if tag == 'PropertyGroup':
+                    group_depth += 1 if event == 'start' else -1
+                elif event == 'end':
+                    if group_depth and tag == property_name and elem.text and elem.text.strip():
+                        return elem.text.strip()
+                    elem.clear()
 
         return None
     except Exception as e:
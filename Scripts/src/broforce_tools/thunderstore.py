@@ -1,32 +1,25 @@
 """Thunderstore API integration and packaging."""
-import filecmp
+import collections
 import fnmatch
+import functools
+import gzip
 import json
 import os
 import re
 import shutil
-import tempfile
 import time
-import xml.etree.ElementTree as ET
 import zipfile
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Union
 
-import questionary
 import typer
 
 from .colors import Colors, CHECK, WARNING_ICON, ARROW
 from .config import get_cache_file, get_defaults, get_release_dir
 from .paths import ensure_dir, get_cache_dir, get_templates_dir
-from .project import Project, detect_project_type, find_mod_metadata_dir
+from .project import Project, detect_metadata_dir_type, detect_project_type, find_mod_metadata_dir
 from .project_types import PROJECT_TYPES
-from .templates import copyanything
-
-try:
-    import urllib.request
-    import urllib.error
-    HAS_URLLIB = True
-except ImportError:
-    HAS_URLLIB = False
+from .templates import VS_USER_FILE_PATTERNS, same_file_contents
 
 FALLBACK_DEPENDENCY_VERSIONS = {
     'UMM': '1.1.0',
@@ -44,46 +37,111 @@ THUNDERSTORE_PACKAGES = {
 
 CACHE_DURATION = 24 * 60 * 60
 
+# Assembly reference name in a .csproj -> THUNDERSTORE_PACKAGES key it implies
+CSPROJ_REFERENCE_DEPENDENCIES = (
+    ('RocketLib', 'RocketLib'),
+    ('BroMakerLib', 'BroMaker'),
+)
 
-def fetch_thunderstore_version(namespace: str, package_name: str) -> Optional[str]:
-    """Fetch latest version from Thunderstore API."""
-    if not HAS_URLLIB:
-        return None
+# Metadata folder files left out of packages, same as when copying templates
+_IGNORE_IN_PACKAGE = shutil.ignore_patterns(*VS_USER_FILE_PATTERNS)
 
-    url = f"https://thunderstore.io/api/experimental/package/{namespace}/{package_name}/"
+# Files read ahead of the zip writer at most, bounding memory on large packages
+_ZIP_READ_AHEAD = 8
+
+_PACKAGE_NAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_INVALID_PACKAGE_CHARS_RE = re.compile(r'[^a-zA-Z0-9_]')
+# First version header (with optional unreleased marker) and its body
+_VERSION_SECTION_RE = re.compile(r'##\s*v?(\d+\.\d+\.\d+)(.*?)\n(.*?)(?=\n##\s|$)', re.DOTALL)
+# Version header carrying an (unreleased) marker; group 1 is the header without it
+_UNRELEASED_HEADER_RE = re.compile(r'(##\s*v?\d+\.\d+\.\d+:?)\s*\(unreleased\)', re.IGNORECASE)
 
+
+def fetch_thunderstore_version(namespace: str, package_name: str,
+                               etag: Optional[str] = None) -> tuple[Optional[str], Optional[str]]:
+    """Fetch latest version from Thunderstore API.
+
+    Returns (version, etag). When etag is given and the package is unchanged
+    (HTTP 304), returns (None, etag) so the caller can keep its cached version.
+    """
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'broforce-tools/1.0'})
-        with urllib.request.urlopen(req, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            return data.get('latest', {}).get('version_number', None)
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError):
-        return None
+        import urllib.request
+        import urllib.error
+    except ImportError:
+        return None, None
 
+    url = f"https://thunderstore.io/api/experimental/package/{namespace}/{package_name}/"
 
+    try:
+        req = urllib.request.Request(url, headers={
+            'User-Agent': 'broforce-tools/1.0',
+            'Accept-Encoding': 'gzip',
+        })
+        if etag:
+            req.add_header('If-None-Match', etag)
+        with urllib.request.urlopen(req, timeout=5) as response:
+            body = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            data = json.loads(body)
+            return data.get('latest', {}).get('version_number', None), response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and etag:
+            return None, etag
+        return None, None
+    except (urllib.error.URLError, json.JSONDecodeError, TimeoutError, gzip.BadGzipFile, EOFError):
+        return None, None
+
+
+@functools.lru_cache(maxsize=1)
 def get_dependency_versions() -> dict[str, str]:
-    """Get dependency versions, fetching from Thunderstore API with caching."""
+    """Get dependency versions, fetching from Thunderstore API with caching.
+
+    The result is also memoized for the rest of the process; clear_cache()
+    resets it.
+    """
     cache_file = get_cache_file()
+    cached_versions = {}
+    cached_etags = {}
 
     if cache_file.exists():
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            cache_data = _read_json(str(cache_file))
 
             cache_time = cache_data.get('timestamp', 0)
+            versions = cache_data.get('versions', {})
             if time.time() - cache_time < CACHE_DURATION:
-                versions = cache_data.get('versions', {})
                 if versions and set(versions.keys()) == set(THUNDERSTORE_PACKAGES.keys()):
                     return versions
+            # Expired: revalidate with ETags so unchanged packages come back as 304
+            cached_versions = versions
+            cached_etags = cache_data.get('etags', {})
         except (json.JSONDecodeError, OSError):
             pass
 
+    # Only revalidate packages we still have a version for
+    sent_etags = {dep_name: cached_etags.get(dep_name) for dep_name in THUNDERSTORE_PACKAGES
+                  if dep_name in cached_versions}
+
+    def fetch(dep_name):
+        return fetch_thunderstore_version(*THUNDERSTORE_PACKAGES[dep_name], etag=sent_etags.get(dep_name))
+
+    # The lookups are independent, so a cold cache costs one round trip, not one per package
+    with ThreadPoolExecutor(max_workers=len(THUNDERSTORE_PACKAGES)) as executor:
+        fetched = dict(zip(THUNDERSTORE_PACKAGES, executor.map(fetch, THUNDERSTORE_PACKAGES)))
+
     versions = {}
+    etags = {}
     fallbacks = []
-    for dep_name, (namespace, package) in THUNDERSTORE_PACKAGES.items():
-        version = fetch_thunderstore_version(namespace, package)
+    for dep_name in THUNDERSTORE_PACKAGES:
+        version, etag = fetched[dep_name]
+        # A 304 echoes the ETag we sent; any other versionless reply falls back below
+        if not version and etag and etag == sent_etags.get(dep_name):
+            version = cached_versions.get(dep_name)
         if version:
             versions[dep_name] = version
+            if etag:
+                etags[dep_name] = etag
         else:
             versions[dep_name] = FALLBACK_DEPENDENCY_VERSIONS[dep_name]
             fallbacks.append(dep_name)
@@ -94,9 +152,9 @@ def get_dependency_versions() -> dict[str, str]:
             'timestamp': time.time(),
             'versions': versions,
             'fallbacks': fallbacks,
+            'etags': etags,
         }
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2)
+        _write_json(str(cache_file), cache_data)
     except OSError:
         pass
 
@@ -117,7 +175,7 @@ def validate_package_name(name: str) -> tuple[bool, str]:
     if len(name) > 128:
         return False, f"Name too long ({len(name)} chars, max 128)"
 
-    if not re.match(r'^[a-zA-Z0-9_]+$', name):
+    if not _PACKAGE_NAME_RE.match(name):
         return False, "Name must contain only alphanumeric characters and underscores"
 
     return True, "OK"
@@ -126,61 +184,55 @@ def validate_package_name(name: str) -> tuple[bool, str]:
 def sanitize_package_name(name: str) -> str:
     """Convert project name to valid package name."""
     sanitized = name.replace(' ', '_')
-    sanitized = re.sub(r'[^a-zA-Z0-9_]', '', sanitized)
+    sanitized = _INVALID_PACKAGE_CHARS_RE.sub('', sanitized)
     return sanitized
 
 
-def detect_dependencies_from_csproj(project_path: str) -> list[str]:
-    """Detect RocketLib and BroMaker dependencies from .csproj file."""
-    dependencies_map = get_dependencies()
-    dependencies = [dependencies_map['UMM']]
-
-    csproj_files = []
+def _find_csproj(project_path: str) -> Optional[str]:
+    """Find the first .csproj within two levels of project_path (os.walk order)."""
     for root, dirs, files in os.walk(project_path):
-        depth = root[len(project_path):].count(os.sep)
-        if depth > 2:
-            continue
         for file in files:
             if file.endswith('.csproj'):
-                csproj_files.append(os.path.join(root, file))
+                return os.path.join(root, file)
+        if root[len(project_path):].count(os.sep) >= 2:
+            dirs.clear()
+    return None
 
-    if not csproj_files:
-        return dependencies
 
-    csproj_path = csproj_files[0]
+@functools.lru_cache(maxsize=32)
+def _csproj_dependency_keys(csproj_path: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    """THUNDERSTORE_PACKAGES keys implied by a .csproj's assembly references.
 
-    try:
-        tree = ET.parse(csproj_path)
-        root = tree.getroot()
+    mtime_ns and size key the cache, so an edited or rebuilt project is re-parsed.
+    """
+    import xml.etree.ElementTree as ET
 
-        ns = {'msbuild': 'http://schemas.microsoft.com/developer/msbuild/2003'}
+    found = set()
+    # Stream the file once, matching <Reference> with or without the msbuild namespace
+    for _, elem in ET.iterparse(csproj_path):
+        if elem.tag.rpartition('}')[2] == 'Reference':
+            include = elem.get('Include', '')
+            for reference, dep_key in CSPROJ_REFERENCE_DEPENDENCIES:
+                if reference in include:
+                    found.add(dep_key)
+        elem.clear()
 
-        for ref in root.findall('.//msbuild:Reference', ns):
-            include = ref.get('Include', '')
-            if 'RocketLib' in include:
-                dependencies.append(dependencies_map['RocketLib'])
-                break
+    return tuple(dep_key for _, dep_key in CSPROJ_REFERENCE_DEPENDENCIES if dep_key in found)
 
-        if dependencies_map['RocketLib'] not in dependencies:
-            for ref in root.findall('.//Reference'):
-                include = ref.get('Include', '')
-                if 'RocketLib' in include:
-                    dependencies.append(dependencies_map['RocketLib'])
-                    break
-
-        for ref in root.findall('.//msbuild:Reference', ns):
-            include = ref.get('Include', '')
-            if 'BroMakerLib' in include:
-                dependencies.append(dependencies_map['BroMaker'])
-                break
 
-        if dependencies_map['BroMaker'] not in dependencies:
-            for ref in root.findall('.//Reference'):
-                include = ref.get('Include', '')
-                if 'BroMakerLib' in include:
-                    dependencies.append(dependencies_map['BroMaker'])
-                    break
+def detect_dependencies_from_csproj(project_path: str) -> list[str]:
+    """Detect RocketLib and BroMaker dependencies from .csproj file."""
+    dependencies_map = get_dependencies()
+    dependencies = [dependencies_map['UMM']]
+
+    csproj_path = _find_csproj(project_path)
+    if not csproj_path:
+        return dependencies
 
+    try:
+        st = os.stat(csproj_path)
+        for dep_key in _csproj_dependency_keys(csproj_path, st.st_mtime_ns, st.st_size):
+            dependencies.append(dependencies_map[dep_key])
     except Exception as e:
         print(f"{Colors.WARNING}Warning: Could not parse .csproj: {e}{Colors.ENDC}")
 
@@ -191,7 +243,7 @@ def find_changelog(releases_path: str) -> Optional[str]:
     """Find changelog file, checking both Changelog.md and CHANGELOG.md."""
     for name in ['Changelog.md', 'CHANGELOG.md']:
         path = os.path.join(releases_path, name)
-        if os.path.exists(path):
+        if os.path.isfile(path):
             return path
     return None
 
@@ -239,12 +291,7 @@ def get_latest_version_entries(changelog_path: str) -> tuple[Optional[str], bool
         with open(changelog_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        # Match first version header (with optional unreleased marker)
-        match = re.search(
-            r'##\s*v?(\d+\.\d+\.\d+)(.*?)\n(.*?)(?=\n##\s|$)',
-            content,
-            re.DOTALL
-        )
+        match = _VERSION_SECTION_RE.search(content)
         if not match:
             return (None, False, [])
 
@@ -285,26 +332,71 @@ def add_changelog_entry(changelog_path: str, entry: str) -> bool:
         else:
             return False
 
-        with open(changelog_path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+        write_file_atomic(changelog_path, ''.join(lines))
 
         return True
     except Exception:
         return False
 
 
-def find_dll_in_modcontent(modcontent_path: str) -> Optional[str]:
-    """Find DLL file in mod metadata folder (_Mod or _ModContent)."""
-    if not os.path.exists(modcontent_path):
+def find_dll_in_modcontent(modcontent_path: str,
+                           files: Optional[list[tuple[str, str]]] = None) -> Optional[str]:
+    """Find DLL file in mod metadata folder (_Mod or _ModContent).
+
+    files, a (path, arcname) listing of the folder from _walk_files, is
+    searched instead of scanning the folder again when given.
+    """
+    if files is not None:
+        for path, _ in files:
+            if path.endswith('.dll') and os.path.dirname(path) == modcontent_path:
+                return path
         return None
 
-    for file in os.listdir(modcontent_path):
-        if file.endswith('.dll'):
-            return os.path.join(modcontent_path, file)
+    try:
+        with os.scandir(modcontent_path) as it:
+            for entry in it:
+                if entry.name.endswith('.dll') and entry.is_file():
+                    return entry.path
+    except OSError:
+        pass
 
     return None
 
 
+def _read_json(path: str) -> dict:
+    """Read a small JSON file with a single binary read."""
+    with open(path, 'rb') as f:
+        return json.loads(f.read())
+
+
+def write_file_atomic(path: str, content: Union[str, bytes]) -> None:
+    """Atomically replace path with content (text is written as UTF-8).
+
+    Writes to a sibling .tmp file first so an interrupted write never leaves
+    a truncated file behind: readers see either the old or the new content.
+    """
+    tmp_path = path + '.tmp'
+    try:
+        if isinstance(content, bytes):
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_json(path: str, data: dict) -> None:
+    """Serialize data up front and atomically replace path with it."""
+    write_file_atomic(path, json.dumps(data, indent=2))
+
+
 def _find_metadata_file(dir_path: str, patterns: list[str]) -> Optional[str]:
     """Find first file matching any of the metadata patterns in a directory."""
     try:
@@ -317,8 +409,8 @@ def _find_metadata_file(dir_path: str, patterns: list[str]) -> Optional[str]:
     return None
 
 
-def get_version_from_info_json(modcontent_path: str, project_type: str) -> Optional[str]:
-    """Get version from project metadata file (Info.json, .mod.json, etc.)."""
+def _find_version_file(modcontent_path: str, project_type: str) -> Optional[str]:
+    """Find the metadata file that holds the project version, if the type has one."""
     if not os.path.exists(modcontent_path):
         return None
 
@@ -326,18 +418,43 @@ def get_version_from_info_json(modcontent_path: str, project_type: str) -> Optio
     if not type_info or not type_info["version_file_label"]:
         return None
 
-    version_file = _find_metadata_file(modcontent_path, type_info["metadata_patterns"])
+    return _find_metadata_file(modcontent_path, type_info["metadata_patterns"])
+
+
+def _load_version_data(modcontent_path: str, project_type: str) -> Optional[dict]:
+    """Parse the project's version file, or None if it is missing or unreadable."""
+    version_file = _find_version_file(modcontent_path, project_type)
     if not version_file:
         return None
 
     try:
-        with open(version_file, 'r', encoding='utf-8') as f:
-            version_data = json.load(f)
-        return version_data.get('Version', None)
+        return _read_json(version_file)
     except Exception:
         return None
 
 
+def get_version_from_info_json(modcontent_path: str, project_type: str) -> Optional[str]:
+    """Get version from project metadata file (Info.json, .mod.json, etc.)."""
+    version_data = _load_version_data(modcontent_path, project_type)
+    if version_data is None:
+        return None
+    return version_data.get('Version', None)
+
+
+def _version_key(version: str) -> Optional[tuple[int, ...]]:
+    """Sortable key for a dotted numeric version, or None if it isn't one.
+
+    Trailing zeros are dropped so "1.0" and "1.0.0" get the same key.
+    """
+    try:
+        parts = [int(x) for x in version.split('.')]
+    except (ValueError, AttributeError):
+        return None
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
 def compare_versions(v1: Optional[str], v2: Optional[str]) -> int:
     """Compare semantic versions. Returns 1 if v1 > v2, -1 if v1 < v2, 0 if equal."""
     if not v1:
@@ -345,41 +462,28 @@ def compare_versions(v1: Optional[str], v2: Optional[str]) -> int:
     if not v2:
         return 1
 
-    try:
-        parts1 = [int(x) for x in v1.split('.')]
-        parts2 = [int(x) for x in v2.split('.')]
-
-        while len(parts1) < len(parts2):
-            parts1.append(0)
-        while len(parts2) < len(parts1):
-            parts2.append(0)
-
-        for p1, p2 in zip(parts1, parts2):
-            if p1 > p2:
-                return 1
-            elif p1 < p2:
-                return -1
-        return 0
-    except (ValueError, AttributeError):
+    key1 = _version_key(v1)
+    key2 = _version_key(v2)
+    if key1 is None or key2 is None:
         return 0
+    return (key1 > key2) - (key1 < key2)
 
 
-def sync_version_file(modcontent_path: str, project_type: str, target_version: str) -> tuple[bool, Optional[str]]:
-    """Sync version in metadata file (Info.json, .mod.json, etc.) with target version."""
-    if not os.path.exists(modcontent_path):
-        return (False, None)
-
-    type_info = PROJECT_TYPES.get(project_type)
-    if not type_info or not type_info["version_file_label"]:
-        return (False, None)
+def sync_version_file(
+    modcontent_path: str, project_type: str, target_version: str,
+    _version_data: Optional[dict] = None,
+) -> tuple[bool, Optional[str]]:
+    """Sync version in metadata file (Info.json, .mod.json, etc.) with target version.
 
-    version_file = _find_metadata_file(modcontent_path, type_info["metadata_patterns"])
+    _version_data can be passed (as parsed by _load_version_data) to avoid
+    re-reading the file; it is updated in place.
+    """
+    version_file = _find_version_file(modcontent_path, project_type)
     if not version_file:
         return (False, None)
 
     try:
-        with open(version_file, 'r', encoding='utf-8') as f:
-            version_data = json.load(f)
+        version_data = _version_data if _version_data is not None else _read_json(version_file)
 
         current_version = version_data.get('Version', '')
 
@@ -388,8 +492,7 @@ def sync_version_file(modcontent_path: str, project_type: str, target_version: s
 
         version_data['Version'] = target_version
 
-        with open(version_file, 'w', encoding='utf-8') as f:
-            json.dump(version_data, f, indent=2)
+        _write_json(version_file, version_data)
 
         return (True, version_file)
 
@@ -400,6 +503,7 @@ def sync_version_file(modcontent_path: str, project_type: str, target_version: s
 
 def clear_cache() -> bool:
     """Clear the dependency cache file."""
+    get_dependency_versions.cache_clear()
     cache_file = get_cache_file()
     if cache_file.exists():
         try:
@@ -465,6 +569,8 @@ def do_init_thunderstore(
             missing.append(("--namespace / -n", "Thunderstore namespace/author"))
             final_namespace = ""
     else:
+        import questionary
+
         print(f"\n{Colors.HEADER}Enter Thunderstore package information:{Colors.ENDC}")
         if default_namespace:
             final_namespace = questionary.text(
@@ -490,6 +596,8 @@ def do_init_thunderstore(
     elif non_interactive:
         final_package_name = suggested_name
     else:
+        import questionary
+
         final_package_name = questionary.text(
             f"Package name [{suggested_name}]:",
             default=suggested_name,
@@ -506,6 +614,8 @@ def do_init_thunderstore(
         missing.append(("--description / -d", "Package description (max 250 chars)"))
         final_description = ""
     else:
+        import questionary
+
         final_description = questionary.text("Description (max 250 chars):").ask()
         if final_description is None:
             raise typer.Exit()
@@ -519,6 +629,8 @@ def do_init_thunderstore(
     elif non_interactive:
         final_website_url = default_website
     else:
+        import questionary
+
         if default_website:
             final_website_url = questionary.text(
                 f"Website/GitHub URL [{default_website}]:",
@@ -542,8 +654,7 @@ def do_init_thunderstore(
     if not changelog_path:
         changelog_path = os.path.join(releases_path, 'Changelog.md')
         print(f"{Colors.WARNING}Changelog not found, creating default{Colors.ENDC}")
-        with open(changelog_path, 'w', encoding='utf-8') as f:
-            f.write('## v1.0.0 (unreleased)\n- Initial release\n')
+        write_file_atomic(changelog_path, '## v1.0.0 (unreleased)\n- Initial release\n')
 
     detected_deps = detect_dependencies_from_csproj(project_path)
     dependencies = get_dependencies()
@@ -570,8 +681,7 @@ def do_init_thunderstore(
         "dependencies": detected_deps
     }
 
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest_data, f, indent=2)
+    _write_json(manifest_path, manifest_data)
 
     print(f"{Colors.GREEN}Created manifest.json{Colors.ENDC}")
 
@@ -602,7 +712,9 @@ def do_init_thunderstore(
     if os.path.exists(icon_dest):
         print(f"{Colors.BLUE}icon.png already exists, skipping{Colors.ENDC}")
     elif os.path.exists(icon_template):
-        shutil.copy(icon_template, icon_dest)
+        # Data only (sendfile/fcopyfile where available): a read-only template,
+        # e.g. from the Nix store, must not leave the user's icon read-only
+        shutil.copyfile(icon_template, icon_dest)
         print(f"{Colors.GREEN}Created icon.png{Colors.ENDC}")
         print(f"{Colors.WARNING}{WARNING_ICON}Replace icon.png with a custom 256x256 image!{Colors.ENDC}")
     else:
@@ -621,6 +733,70 @@ def do_init_thunderstore(
     print(f"  4. Run: bt package \"{project_name}\"")
 
 
+def _walk_files(root: str, prefix: str = '', ignore=None) -> Iterator[tuple[str, str]]:
+    """Yield (path, arcname) for every file under root.
+
+    Uses os.scandir so file/dir checks come from the directory entries, and
+    builds arcnames incrementally instead of calling os.path.relpath per file.
+    ignore follows the shutil.copytree convention: ignore(dir, names) returns
+    the names to skip in that directory.
+    """
+    stack = [(root, prefix)]
+    while stack:
+        dir_path, arc_dir = stack.pop()
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        if ignore is not None:
+            ignored = ignore(dir_path, [entry.name for entry in entries])
+            entries = [entry for entry in entries if entry.name not in ignored]
+        for entry in entries:
+            arcname = arc_dir + entry.name
+            if entry.is_dir():
+                stack.append((entry.path, arcname + '/'))
+            elif entry.is_file():
+                yield entry.path, arcname
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _write_files_to_zip(zipf: zipfile.ZipFile, files: list[tuple[str, str]]) -> None:
+    """Add (path, arcname) pairs to zipf, reading files ahead on worker threads.
+
+    zipfile can only deflate one member at a time, so compression stays on
+    this thread; the pool overlaps the next few files' disk reads with it,
+    keeping at most _ZIP_READ_AHEAD files in memory.
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        queued = iter(files)
+        pending = collections.deque()
+
+        def read_next() -> None:
+            item = next(queued, None)
+            if item is not None:
+                pending.append((*item, executor.submit(_read_bytes, item[0])))
+
+        for _ in range(_ZIP_READ_AHEAD):
+            read_next()
+        while pending:
+            path, arcname, read = pending.popleft()
+            read_next()
+            data = read.result()
+            zinfo = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+            zipf.writestr(zinfo, data, compress_type=zipf.compression, compresslevel=zipf.compresslevel)
+
+
+def _zip_compress_level() -> Optional[int]:
+    """Deflate level from BROFORCE_ZIP_LEVEL (0-9), or None for zlib's default."""
+    try:
+        level = int(os.environ.get('BROFORCE_ZIP_LEVEL', ''))
+    except ValueError:
+        return None
+    return level if 0 <= level <= 9 else None
+
+
 def _copy_to_release_dir(zip_path: str, namespace: str, package_name: str) -> None:
     """Copy a packaged zip to the central release directory, if configured."""
     release_dir = get_release_dir()
@@ -684,19 +860,24 @@ def do_package(
         print(f"{Colors.FAIL}Error: Changelog.md or CHANGELOG.md not found{Colors.ENDC}")
         raise typer.Exit(1)
 
-    project_type = detect_project_type(project_path)
-    if not project_type:
-        print(f"{Colors.FAIL}Error: Could not detect project type{Colors.ENDC}")
-        raise typer.Exit(1)
-
     metadata_dir = find_mod_metadata_dir(project_path)
     if not metadata_dir:
         print(f"{Colors.FAIL}Error: Could not find metadata folder{Colors.ENDC}")
         raise typer.Exit(1)
 
+    project_type = detect_metadata_dir_type(metadata_dir)
+    if not project_type:
+        print(f"{Colors.FAIL}Error: Could not detect project type{Colors.ENDC}")
+        raise typer.Exit(1)
+
     type_info = PROJECT_TYPES.get(project_type, {})
+
+    # The metadata folder is walked once; the DLL check and the archive share the listing
+    mod_prefix = f"UMM/{type_info.get('install_subdir', 'Mods')}/{project_name}/"
+    mod_files = list(_walk_files(metadata_dir, mod_prefix, ignore=_IGNORE_IN_PACKAGE))
+
     if type_info.get("has_code", True):
-        dll_path = find_dll_in_modcontent(metadata_dir)
+        dll_path = find_dll_in_modcontent(metadata_dir, mod_files)
 
         if not dll_path:
             print(f"{Colors.FAIL}Error: No DLL found in metadata folder{Colors.ENDC}")
@@ -704,27 +885,23 @@ def do_package(
             raise typer.Exit(1)
 
     icon_template = os.path.join(template_dir, 'ThunderstorePackage', 'icon.png')
-    if os.path.exists(icon_template) and filecmp.cmp(icon_path, icon_template, shallow=False):
+    if same_file_contents(icon_path, icon_template):
         print(f"{Colors.WARNING}{WARNING_ICON}Warning: Using placeholder icon{Colors.ENDC}")
 
     changelog_name = os.path.basename(changelog_path)
 
+    # Parsed once and shared by the version check, sync_version_file and the BroMakerVersion check
+    version_data = _load_version_data(metadata_dir, project_type)
+    # Likewise read once for the version check and the update written back below
+    manifest_data = _read_json(manifest_path)
+
     if version_override:
         version = version_override
         print(f"{Colors.CYAN}Using version override: {version}{Colors.ENDC}")
     else:
         changelog_version = get_version_from_changelog(changelog_path)
-        manifest_version = None
-        info_version = None
-
-        try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                manifest_data_temp = json.load(f)
-            manifest_version = manifest_data_temp.get('version_number', None)
-        except Exception:
-            pass
-
-        info_version = get_version_from_info_json(metadata_dir, project_type)
+        manifest_version = manifest_data.get('version_number', None)
+        info_version = version_data.get('Version', None) if version_data is not None else None
 
         versions = {
             changelog_name: changelog_version,
@@ -739,14 +916,8 @@ def do_package(
             print(f"Expected version in {changelog_name}, manifest.json, or Info.json/.mod.json")
             raise typer.Exit(1)
 
-        highest_version = None
-        highest_source = None
-        for source, ver in valid_versions.items():
-            if highest_version is None or compare_versions(ver, highest_version) > 0:
-                highest_version = ver
-                highest_source = source
-
-        version = highest_version
+        # One key per version; ties keep the first source, unparseable versions rank lowest
+        highest_source, version = max(valid_versions.items(), key=lambda item: _version_key(item[1]) or ())
 
         print(f"{Colors.CYAN}Package version: {version}{Colors.ENDC}")
 
@@ -761,6 +932,8 @@ def do_package(
                     print(f"\n{Colors.FAIL}Error: Changelog is outdated. Use --allow-outdated-changelog to package anyway.{Colors.ENDC}")
                     raise typer.Exit(1)
             else:
+                import questionary
+
                 continue_package = questionary.confirm(
                     f"Continue packaging with version {version}?",
                     default=False
@@ -771,9 +944,6 @@ def do_package(
                     print(f"Update {changelog_name} to version {version} before packaging.")
                     raise typer.Exit()
 
-    with open(manifest_path, 'r', encoding='utf-8') as f:
-        manifest_data = json.load(f)
-
     namespace = manifest_data.get('author', 'Unknown')
     package_name = manifest_data.get('name', project_name.replace(' ', '_'))
 
@@ -785,6 +955,8 @@ def do_package(
             print(f"\n{Colors.FAIL}Error: No author set in manifest.json. Edit manifest.json to add an author.{Colors.ENDC}")
             raise typer.Exit(1)
 
+        import questionary
+
         set_author = questionary.confirm(
             "Set author name now?",
             default=True
@@ -806,25 +978,17 @@ def do_package(
         else:
             print(f"{Colors.WARNING}Continuing with 'Unknown' as author (package will be named Unknown-{package_name}-{version}.zip){Colors.ENDC}")
 
-    dependencies = get_dependencies()
+    # 'Namespace-Name' -> current 'Namespace-Name-version', so each manifest entry is one lookup
+    latest_by_name = {dep_string.rsplit('-', 1)[0]: dep_string for dep_string in get_dependencies().values()}
     current_deps = manifest_data.get('dependencies', [])
     outdated_deps = []
     updated_deps = []
 
     for dep in current_deps:
-        parts = dep.rsplit('-', 1)
-        if len(parts) == 2:
-            dep_name_part, dep_version = parts
-            for dep_key, current_dep_string in dependencies.items():
-                if current_dep_string.startswith(dep_name_part + '-'):
-                    if dep != current_dep_string:
-                        outdated_deps.append((dep, current_dep_string))
-                        updated_deps.append(current_dep_string)
-                    else:
-                        updated_deps.append(dep)
-                    break
-            else:
-                updated_deps.append(dep)
+        current_dep_string = latest_by_name.get(dep.rsplit('-', 1)[0]) if '-' in dep else None
+        if current_dep_string and dep != current_dep_string:
+            outdated_deps.append((dep, current_dep_string))
+            updated_deps.append(current_dep_string)
         else:
             updated_deps.append(dep)
 
@@ -836,6 +1000,8 @@ def do_package(
         if non_interactive:
             should_update = update_deps if update_deps is not None else True
         else:
+            import questionary
+
             update = questionary.confirm(
                 "Update dependencies to latest versions?",
                 default=True
@@ -869,6 +1035,8 @@ def do_package(
         if non_interactive:
             should_add = add_missing_deps if add_missing_deps is not None else True
         else:
+            import questionary
+
             add_deps_prompt = questionary.confirm(
                 "Add missing dependencies to manifest?",
                 default=True
@@ -891,15 +1059,16 @@ def do_package(
     old_manifest_version = manifest_data.get('version_number', None)
     manifest_data['version_number'] = version
 
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest_data, f, indent=2)
+    _write_json(manifest_path, manifest_data)
 
     if old_manifest_version != version:
         print(f"{Colors.GREEN}Updated manifest.json version to {version}{Colors.ENDC}")
     else:
         print(f"{Colors.BLUE}manifest.json already at version {version}{Colors.ENDC}")
 
-    updated, version_file_path = sync_version_file(metadata_dir, project_type, version)
+    updated, version_file_path = sync_version_file(
+        metadata_dir, project_type, version, _version_data=version_data,
+    )
     if updated:
         version_file_name = os.path.basename(version_file_path)
         print(f"{Colors.GREEN}Updated {version_file_name} version to {version}{Colors.ENDC}")
@@ -913,8 +1082,7 @@ def do_package(
 
     if project_type == 'bro' and version_file_path:
         try:
-            with open(version_file_path, 'r', encoding='utf-8') as f:
-                mod_json_data = json.load(f)
+            mod_json_data = version_data if version_data is not None else _read_json(version_file_path)
 
             current_bromaker_version = mod_json_data.get('BroMakerVersion', None)
             if current_bromaker_version:
@@ -928,6 +1096,8 @@ def do_package(
                     if non_interactive:
                         should_update_bromaker = True
                     else:
+                        import questionary
+
                         update_bromaker = questionary.confirm(
                             "Update BroMakerVersion to latest?",
                             default=True
@@ -939,8 +1109,7 @@ def do_package(
 
                     if should_update_bromaker:
                         mod_json_data['BroMakerVersion'] = latest_bromaker_version
-                        with open(version_file_path, 'w', encoding='utf-8') as f:
-                            json.dump(mod_json_data, f, indent=2)
+                        _write_json(version_file_path, mod_json_data)
                         print(f"{Colors.GREEN}Updated BroMakerVersion to {latest_bromaker_version}{Colors.ENDC}")
         except (json.JSONDecodeError, OSError):
             pass
@@ -957,6 +1126,8 @@ def do_package(
                 raise typer.Exit(1)
             should_overwrite = True
         else:
+            import questionary
+
             overwrite_prompt = questionary.confirm(
                 "Overwrite existing package?",
                 default=True
@@ -974,58 +1145,49 @@ def do_package(
         os.remove(zip_path)
         print(f"{Colors.BLUE}Removed existing package{Colors.ENDC}")
     else:
-        old_zips = [f for f in os.listdir(releases_path) if f.endswith('.zip')]
+        with os.scandir(releases_path) as it:
+            old_zips = [entry for entry in it if entry.name.endswith('.zip') and entry.is_file()]
         if old_zips:
             prev_versions_dir = os.path.join(releases_path, 'Previous Versions')
-            if not os.path.exists(prev_versions_dir):
-                os.makedirs(prev_versions_dir)
+            os.makedirs(prev_versions_dir, exist_ok=True)
 
+            # Same directory tree, so a plain rename; no copy fallback needed
             for old_zip in old_zips:
-                old_zip_path = os.path.join(releases_path, old_zip)
-                new_zip_path = os.path.join(prev_versions_dir, old_zip)
-                shutil.move(old_zip_path, new_zip_path)
-                print(f"{Colors.BLUE}Archived: {old_zip}{Colors.ENDC}")
+                os.replace(old_zip.path, os.path.join(prev_versions_dir, old_zip.name))
+                print(f"{Colors.BLUE}Archived: {old_zip.name}{Colors.ENDC}")
 
     print(f"{Colors.CYAN}Creating package: {zip_filename}{Colors.ENDC}")
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        shutil.copy2(manifest_path, os.path.join(temp_dir, 'manifest.json'))
-        shutil.copy2(readme_path, os.path.join(temp_dir, 'README.md'))
-        shutil.copy2(icon_path, os.path.join(temp_dir, 'icon.png'))
-
-        with open(changelog_path, 'r', encoding='utf-8') as f:
-            changelog_content = f.read()
-
-        changelog_cleaned = re.sub(
-            r'(##\s*v?\d+\.\d+\.\d+:?)\s*\(unreleased\)',
-            r'\1',
-            changelog_content,
-            flags=re.IGNORECASE
-        )
-
-        if not keep_unreleased and changelog_cleaned != changelog_content:
-            with open(changelog_path, 'w', encoding='utf-8') as f:
-                f.write(changelog_cleaned)
-            print(f"{Colors.GREEN}Removed (unreleased) tag from {changelog_name}{Colors.ENDC}")
-
-        with open(os.path.join(temp_dir, 'CHANGELOG.md'), 'w', encoding='utf-8') as f:
-            f.write(changelog_cleaned)
-
-        umm_base = os.path.join(temp_dir, 'UMM')
-        target_dir = os.path.join(umm_base, type_info.get("install_subdir", "Mods"), project_name)
-
-        os.makedirs(target_dir, exist_ok=True)
-
-        copyanything(metadata_dir, target_dir)
-
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, strict_timestamps=False) as zipf:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, temp_dir)
-                    zipf.write(file_path, arcname)
-
-    zip_size = os.path.getsize(zip_path) / 1024
+    changelog_bytes = _read_bytes(changelog_path)
+
+    # Most repackages have no marker, so skip decoding and the regex entirely
+    if b'(unreleased)' in changelog_bytes.lower():
+        changelog_content = changelog_bytes.decode('utf-8')
+        changelog_cleaned = _UNRELEASED_HEADER_RE.sub(r'\1', changelog_content)
+
+        if changelog_cleaned != changelog_content:
+            changelog_bytes = changelog_cleaned.encode('utf-8')
+            if not keep_unreleased:
+                write_file_atomic(changelog_path, changelog_bytes)
+                print(f"{Colors.GREEN}Removed (unreleased) tag from {changelog_name}{Colors.ENDC}")
+
+    # Everything is added straight from the project and releases folder; only
+    # the cleaned changelog comes from memory, so nothing is staged on disk
+    with open(zip_path, 'wb') as zip_file:
+        with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED,
+                             compresslevel=_zip_compress_level(), strict_timestamps=False) as zipf:
+            _write_files_to_zip(zipf, [
+                (manifest_path, 'manifest.json'),
+                (readme_path, 'README.md'),
+                (icon_path, 'icon.png'),
+                *mod_files,
+            ])
+            # Same metadata as the on-disk changelog, so the member gets a regular file's mode
+            changelog_info = zipfile.ZipInfo.from_file(changelog_path, 'CHANGELOG.md', strict_timestamps=False)
+            zipf.writestr(changelog_info, changelog_bytes,
+                          compress_type=zipf.compression, compresslevel=zipf.compresslevel)
+        # ZipFile leaves a caller-owned file open, positioned after the central directory
+        zip_size = zip_file.tell() / 1024
 
     print(f"\n{Colors.GREEN}{Colors.BOLD}{CHECK} Package created!{Colors.ENDC}")
     print(f"{Colors.CYAN}Version:{Colors.ENDC} {version}")
@@ -64,3 +64,12 @@ def isolated_config(tmp_path, monkeypatch):
     """Isolate config to a temp directory so tests don't touch real config."""
     monkeypatch.setenv("BROFORCE_CONFIG_DIR", str(tmp_path))
     return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def reset_dependency_versions():
+    """Drop memoized dependency versions so each test sees its own cache dir."""
+    from broforce_tools.thunderstore import get_dependency_versions
+    get_dependency_versions.cache_clear()
+    yield
+    get_dependency_versions.cache_clear()
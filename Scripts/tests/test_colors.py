@@ -1,7 +1,7 @@
-"""Tests for colors module - unicode detection."""
+"""Tests for colors module - unicode and color detection."""
 import sys
 
-from broforce_tools.colors import _supports_unicode
+from broforce_tools.colors import _supports_color, _supports_unicode
 
 
 class TestSupportsUnicode:
@@ -27,3 +27,25 @@ class TestSupportsUnicode:
         # Just verify it doesn't crash
         result = _supports_unicode()
         assert isinstance(result, bool)
+
+
+class TestSupportsColor:
+    def test_tty(self, monkeypatch):
+        monkeypatch.delenv("NO_COLOR", raising=False)
+        monkeypatch.setattr(sys, "stdout", type("FakeStdout", (), {"isatty": lambda self: True})())
+        assert _supports_color()
+
+    def test_redirected(self, monkeypatch):
+        monkeypatch.delenv("NO_COLOR", raising=False)
+        monkeypatch.setattr(sys, "stdout", type("FakeStdout", (), {"isatty": lambda self: False})())
+        assert not _supports_color()
+
+    def test_no_color_env(self, monkeypatch):
+        monkeypatch.setenv("NO_COLOR", "1")
+        monkeypatch.setattr(sys, "stdout", type("FakeStdout", (), {"isatty": lambda self: True})())
+        assert not _supports_color()
+
+    def test_no_isatty_attr(self, monkeypatch):
+        monkeypatch.delenv("NO_COLOR", raising=False)
+        monkeypatch.setattr(sys, "stdout", type("FakeStdout", (), {})())
+        assert not _supports_color()
@@ -0,0 +1,41 @@
+"""Tests for completion_helper - names printed for shell completion."""
+import json
+import subprocess
+import sys
+
+import pytest
+
+from broforce_tools import completion_helper
+
+
+def _run(monkeypatch, capsys, mode):
+    monkeypatch.setattr(sys, "argv", ["completion_helper", mode])
+    completion_helper.main()
+    return capsys.readouterr().out
+
+
+class TestMain:
+    def test_repos(self, fixtures_repos, isolated_config, monkeypatch, capsys):
+        (isolated_config / "config.json").write_text(json.dumps({"repos": ["TestRepo", "AnotherRepo"]}))
+        monkeypatch.setenv("BROFORCE_REPOS_PARENT", str(fixtures_repos))
+        assert _run(monkeypatch, capsys, "repos") == "TestRepo\nAnotherRepo\n"
+
+    def test_package_lists_projects_with_metadata(self, fixtures_repos, isolated_config, monkeypatch, capsys):
+        (isolated_config / "config.json").write_text(json.dumps({"repos": ["TestRepo"]}))
+        monkeypatch.setenv("BROFORCE_REPOS_PARENT", str(fixtures_repos))
+        names = _run(monkeypatch, capsys, "package").splitlines()
+        assert "TestMod" in names
+        assert "NewMod" not in names
+
+    def test_unknown_mode_prints_nothing(self, fixtures_repos, isolated_config, monkeypatch, capsys):
+        monkeypatch.setenv("BROFORCE_REPOS_PARENT", str(fixtures_repos))
+        assert _run(monkeypatch, capsys, "bogus") == ""
+
+
+class TestLazyImports:
+    @pytest.mark.parametrize("module", ["questionary", "urllib.request", "xml.etree.ElementTree"])
+    def test_cli_import_skips_module(self, module):
+        """Completion imports the CLI on every TAB, so modules used by a single command load on demand."""
+        code = f"import sys, broforce_tools.cli; print({module!r} in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
@@ -180,6 +180,37 @@ class TestConfigMerge:
         assert config == {"repos": []}
 
 
+class TestConfigCache:
+    def test_picks_up_external_edit(self, isolated_config):
+        (isolated_config / "config.json").write_text('{"repos": ["A"]}')
+        assert load_config()["repos"] == ["A"]
+        (isolated_config / "config.json").write_text('{"repos": ["A", "B"]}')
+        assert load_config()["repos"] == ["A", "B"]
+
+    def test_save_invalidates(self, isolated_config):
+        save_config({"repos": ["A"]})
+        assert load_config()["repos"] == ["A"]
+        save_config({"repos": ["B"]})
+        assert load_config()["repos"] == ["B"]
+
+    def test_returned_dict_is_a_copy(self, isolated_config):
+        (isolated_config / "config.json").write_text('{"repos": ["A"]}')
+        load_config()["repos"].append("B")
+        assert load_config()["repos"] == ["A"]
+
+    def test_getters_return_copies(self, isolated_config):
+        (isolated_config / "config.json").write_text(
+            '{"repos": ["A"], "ignore": {"A": ["X"]}, "defaults": {"namespace": "N"}}'
+        )
+        get_configured_repos().append("B")
+        get_ignored_projects("A").append("Y")
+        get_defaults()["namespace"] = "Changed"
+        config = load_config()
+        assert config["repos"] == ["A"]
+        assert config["ignore"] == {"A": ["X"]}
+        assert config["defaults"] == {"namespace": "N"}
+
+
 class TestConfigCommands:
     def test_config_path(self, isolated_config):
         result = runner.invoke(app, ["config", "path"])
@@ -1,10 +1,12 @@
 """Tests for the create command - project creation from templates."""
 import json
 import os
+import shutil
 
 import pytest
 from typer.testing import CliRunner
 
+from broforce_tools import cli
 from broforce_tools.cli import app
 
 runner = CliRunner()
@@ -57,8 +59,7 @@ class TestCreateMod:
             "-o", "TestRepo", "-y", "--no-thunderstore",
         ])
         changelog = create_env["repo"] / "Releases" / "TestMod" / "Changelog.md"
-        assert changelog.exists()
-        assert "(unreleased)" in changelog.read_text()
+        assert changelog.read_text() == "## v1.0.0 (unreleased)\n- Initial release\n"
 
     def test_csproj_has_correct_name(self, create_env):
         runner.invoke(app, [
@@ -71,6 +72,30 @@ class TestCreateMod:
         assert "My Cool Mod" in content
         assert "Mod Template" not in content
 
+    def test_leaves_no_staging_folder(self, create_env):
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 0, result.output
+        assert sorted(p.name for p in create_env["repo"].iterdir()) == ["Releases", "Scripts", "TestMod"]
+
+    def test_staging_folder_removed_before_follow_up_steps(self, create_env, monkeypatch):
+        repo_listings = []
+        real_write = cli.write_file_atomic
+
+        def recording_write(path, content):
+            repo_listings.append(sorted(p.name for p in create_env["repo"].iterdir()))
+            real_write(path, content)
+
+        monkeypatch.setattr(cli, "write_file_atomic", recording_write)
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 0, result.output
+        assert repo_listings == [["Releases", "Scripts", "TestMod"]]
+
     def test_copies_build_targets(self, create_env):
         runner.invoke(app, [
             "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
@@ -79,6 +104,35 @@ class TestCreateMod:
         targets = create_env["repo"] / "Scripts" / "BroforceModBuild.targets"
         assert targets.exists()
 
+    def test_updates_outdated_build_targets(self, create_env):
+        scripts = create_env["repo"] / "Scripts"
+        scripts.mkdir()
+        (scripts / "BroforceModBuild.targets").write_text("<Project />")
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 0, result.output
+        assert "Updated BroforceModBuild.targets" in result.output
+        source = os.path.join(create_env["templates_dir"], "Scripts", "BroforceModBuild.targets")
+        with open(source, "rb") as f:
+            assert (scripts / "BroforceModBuild.targets").read_bytes() == f.read()
+
+    def test_creating_in_templates_repo_skips_targets(self, create_env, tmp_path, monkeypatch):
+        templates = tmp_path / "repos" / "Broforce-Templates"
+        for name in ("Mod Template", "Scripts"):
+            shutil.copytree(os.path.join(create_env["templates_dir"], name), templates / name)
+        targets = templates / "Scripts" / "BroforceModBuild.targets"
+        targets_before = targets.stat().st_mtime_ns
+        monkeypatch.setenv("BROFORCE_TEMPLATES_DIR", str(templates))
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "Broforce-Templates", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 0, result.output
+        assert "BroforceModBuild.targets" not in result.output
+        assert targets.stat().st_mtime_ns == targets_before
+
     def test_duplicate_name_fails(self, create_env):
         runner.invoke(app, [
             "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
@@ -90,6 +144,96 @@ class TestCreateMod:
         ])
         assert result.exit_code == 1
 
+    def test_existing_repo_directory_fails(self, create_env):
+        (create_env["repo"] / "TestMod").mkdir()
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Repository directory already exists" in result.output
+
+    def test_existing_release_folder_fails_and_is_kept(self, create_env):
+        release = create_env["repo"] / "Releases" / "TestMod"
+        release.mkdir(parents=True)
+        (release / "keep.txt").write_text("mine")
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Release directory already exists" in result.output
+        assert (release / "keep.txt").read_text() == "mine"
+        assert not (create_env["repo"] / "TestMod").exists()
+
+    def test_missing_template_fails_and_rolls_back(self, create_env, tmp_path, monkeypatch):
+        templates = tmp_path / "empty-templates"
+        shutil.copytree(os.path.join(create_env["templates_dir"], "Scripts"), templates / "Scripts")
+        monkeypatch.setenv("BROFORCE_TEMPLATES_DIR", str(templates))
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Template directory not found" in result.output
+        assert not (create_env["repo"] / "Releases" / "TestMod").exists()
+        assert not any(p.name.startswith(".staging-") for p in create_env["repo"].iterdir())
+
+    def test_name_differing_only_in_case_fails(self, create_env):
+        (create_env["repo"] / "testmod").mkdir()
+        if not (create_env["repo"] / "TESTMOD").exists():
+            pytest.skip("case-sensitive filesystem")
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Repository directory already exists" in result.output
+
+    def test_uses_existing_singular_release_folder(self, create_env):
+        (create_env["repo"] / "Release").mkdir()
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 0, result.output
+        assert (create_env["repo"] / "Release" / "TestMod" / "Changelog.md").exists()
+        assert not (create_env["repo"] / "Releases").exists()
+
+    def test_missing_output_repo_fails(self, create_env):
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "NoSuchRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Output repository does not exist" in result.output
+
+    def test_failure_rolls_back(self, create_env, monkeypatch):
+        def boom(*args, **kwargs):
+            raise RuntimeError("boom")
+        monkeypatch.setattr("broforce_tools.cli.rename_and_replace", boom)
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert sorted(p.name for p in create_env["repo"].iterdir()) == ["Releases", "Scripts"]
+        assert not (create_env["repo"] / "Releases" / "TestMod").exists()
+        assert "RuntimeError: boom" in result.output
+        assert "Traceback" not in result.output
+
+    def test_failure_traceback_when_verbose(self, create_env, monkeypatch):
+        def boom(*args, **kwargs):
+            raise RuntimeError("boom")
+        monkeypatch.setattr("broforce_tools.cli.rename_and_replace", boom)
+        monkeypatch.setenv("BROFORCE_VERBOSE", "1")
+        result = runner.invoke(app, [
+            "create", "-t", "mod", "-n", "TestMod", "-a", "TestAuthor",
+            "-o", "TestRepo", "-y", "--no-thunderstore",
+        ])
+        assert result.exit_code == 1
+        assert "Traceback" in result.output
+
     def test_invalid_type_fails(self, create_env):
         result = runner.invoke(app, [
             "create", "-t", "invalid", "-n", "TestMod", "-a", "TestAuthor",
@@ -109,6 +253,7 @@ class TestCreateWithRocketLib:
         content = csproj.read_text()
         assert "RocketLib" in content
         assert "$(RocketLibPath)" in content
+        assert content.index('Include="RocketLib"') < content.index('Include="UnityModManager"')
 
     def test_no_rocketlib_by_default(self, create_env):
         runner.invoke(app, [
@@ -0,0 +1,231 @@
+"""Tests for the package and init-thunderstore commands - building Thunderstore zips."""
+import json
+import os
+import shutil
+import stat
+import sys
+import zipfile
+
+import pytest
+from typer.testing import CliRunner
+
+from broforce_tools.cli import app
+from broforce_tools.thunderstore import FALLBACK_DEPENDENCY_VERSIONS
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def package_env(tmp_path, monkeypatch, fixtures_repos):
+    """Copy the fixture repo to tmp_path and point the CLI at it, offline."""
+    repos_parent = tmp_path / "repos"
+    shutil.copytree(fixtures_repos / "TestRepo", repos_parent / "TestRepo")
+
+    templates_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    monkeypatch.setenv("BROFORCE_TEMPLATES_DIR", templates_dir)
+    monkeypatch.setenv("BROFORCE_REPOS_PARENT", str(repos_parent))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "config.json").write_text(json.dumps({"repos": ["TestRepo"]}))
+    monkeypatch.setenv("BROFORCE_CONFIG_DIR", str(config_dir))
+
+    monkeypatch.setattr(
+        "broforce_tools.thunderstore.fetch_thunderstore_version",
+        lambda namespace, package, etag=None: (None, None),
+    )
+
+    return repos_parent / "TestRepo"
+
+
+class TestPackageBro:
+    def test_creates_zip(self, package_env):
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            names = set(zf.namelist())
+        assert "manifest.json" in names
+        assert "CHANGELOG.md" in names
+        assert "UMM/BroMaker_Storage/TestBro/TestBro.mod.json" in names
+
+    def test_syncs_mod_json(self, package_env):
+        runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        mod_json = package_env / "TestBro" / "_ModContent" / "TestBro.mod.json"
+        data = json.loads(mod_json.read_text())
+        assert data["Version"] == "1.2.0"
+        assert data["BroMakerVersion"] == FALLBACK_DEPENDENCY_VERSIONS["BroMaker"]
+        assert data["Name"] == "TestBro"
+
+    def test_updates_manifest(self, package_env):
+        runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        manifest = json.loads((package_env / "Releases" / "TestBro" / "manifest.json").read_text())
+        assert manifest["version_number"] == "1.2.0"
+
+    def test_excludes_vs_user_files(self, package_env):
+        modcontent = package_env / "TestBro" / "_ModContent"
+        (modcontent / ".vs").mkdir()
+        (modcontent / ".vs" / "state.bin").write_bytes(b"x")
+        (modcontent / "TestBro.csproj.user").write_text("")
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            names = zf.namelist()
+        assert not any(".vs" in name or name.endswith(".user") for name in names)
+
+    def test_compress_level_env(self, package_env, monkeypatch):
+        monkeypatch.setenv("BROFORCE_ZIP_LEVEL", "0")
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            info = zf.getinfo("manifest.json")
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+        assert info.compress_size >= info.file_size
+
+    def test_archive_members_match_sources(self, package_env):
+        runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        modcontent = package_env / "TestBro" / "_ModContent"
+        with zipfile.ZipFile(zip_path) as zf:
+            assert zf.testzip() is None
+            for source in modcontent.iterdir():
+                arcname = f"UMM/BroMaker_Storage/TestBro/{source.name}"
+                assert zf.read(arcname) == source.read_bytes()
+
+    def test_strips_unreleased_marker(self, package_env):
+        changelog = package_env / "Releases" / "TestBro" / "Changelog.md"
+        changelog.write_text("## v1.2.0 (Unreleased)\n- New thing\n\n## v1.0.0\n- Initial release\n")
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        expected = "## v1.2.0\n- New thing\n\n## v1.0.0\n- Initial release\n"
+        assert changelog.read_text() == expected
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            assert zf.read("CHANGELOG.md").decode("utf-8") == expected
+
+    def test_changelog_member_is_regular_file(self, package_env):
+        changelog = package_env / "Releases" / "TestBro" / "Changelog.md"
+        changelog.write_text("## v1.2.0 (unreleased)\n- New thing\n")
+        changelog.chmod(0o644)
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            info = zf.getinfo("CHANGELOG.md")
+        assert info.external_attr >> 16 == stat.S_IFREG | 0o644
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+
+    def test_keep_unreleased_leaves_source(self, package_env):
+        changelog = package_env / "Releases" / "TestBro" / "Changelog.md"
+        original = "## v1.2.0 (unreleased)\n- New thing\n"
+        changelog.write_text(original)
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0", "--keep-unreleased"])
+        assert result.exit_code == 0, result.output
+        assert changelog.read_text() == original
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            assert zf.read("CHANGELOG.md").decode("utf-8") == "## v1.2.0\n- New thing\n"
+
+    def test_changelog_without_marker_packaged_verbatim(self, package_env):
+        changelog = package_env / "Releases" / "TestBro" / "Changelog.md"
+        original = b"## v1.2.0\r\n- Windows line endings\r\n"
+        changelog.write_bytes(original)
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        assert changelog.read_bytes() == original
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            assert zf.read("CHANGELOG.md") == original
+
+    def test_requires_top_level_dll(self, package_env):
+        modcontent = package_env / "TestBro" / "_ModContent"
+        (modcontent / "lib").mkdir()
+        for dll in modcontent.glob("*.dll"):
+            dll.rename(modcontent / "lib" / dll.name)
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 1
+        assert "No DLL found" in result.output
+
+    def test_missing_metadata_folder(self, package_env):
+        shutil.rmtree(package_env / "TestBro" / "_ModContent")
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 1
+        assert "Could not find metadata folder" in result.output
+
+    def test_updates_known_dependencies_only(self, package_env):
+        manifest_path = package_env / "Releases" / "TestBro" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["dependencies"] = ["UMM-UMM-0.0.1", "Someone-Other-3.0.0", "BroMaker-BroMaker-0.0.1"]
+        manifest_path.write_text(json.dumps(manifest))
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        deps = json.loads(manifest_path.read_text())["dependencies"]
+        assert deps == [
+            f"UMM-UMM-{FALLBACK_DEPENDENCY_VERSIONS['UMM']}",
+            "Someone-Other-3.0.0",
+            f"BroMaker-BroMaker-{FALLBACK_DEPENDENCY_VERSIONS['BroMaker']}",
+        ]
+
+    def test_version_from_manifest_when_highest(self, package_env):
+        manifest_path = package_env / "Releases" / "TestBro" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["version_number"] = "1.5.0"
+        manifest_path.write_text(json.dumps(manifest))
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--allow-outdated-changelog"])
+        assert result.exit_code == 0, result.output
+        assert (package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.5.0.zip").exists()
+
+    def test_archives_previous_zips(self, package_env):
+        releases = package_env / "Releases" / "TestBro"
+        (releases / "TestAuthor-TestBro-1.0.0.zip").write_bytes(b"old")
+        (releases / "Previous Versions").mkdir()
+        (releases / "Previous Versions" / "TestAuthor-TestBro-0.9.0.zip").write_bytes(b"older")
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        assert sorted(p.name for p in releases.glob("*.zip")) == ["TestAuthor-TestBro-1.2.0.zip"]
+        archived = sorted(p.name for p in (releases / "Previous Versions").iterdir())
+        assert archived == ["TestAuthor-TestBro-0.9.0.zip", "TestAuthor-TestBro-1.0.0.zip"]
+        assert (releases / "Previous Versions" / "TestAuthor-TestBro-1.0.0.zip").read_bytes() == b"old"
+
+    def test_non_interactive_skips_questionary(self, package_env, monkeypatch):
+        monkeypatch.delitem(sys.modules, "questionary", raising=False)
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        assert "questionary" not in sys.modules
+
+    def test_reports_final_zip_size(self, package_env):
+        result = runner.invoke(app, ["package", "TestBro", "-y", "--version", "1.2.0"])
+        assert result.exit_code == 0, result.output
+        zip_path = package_env / "Releases" / "TestBro" / "TestAuthor-TestBro-1.2.0.zip"
+        assert f"{zip_path.stat().st_size / 1024:.1f} KB" in result.output
+
+
+class TestInitThunderstore:
+    def test_icon_copy_is_writable(self, package_env, tmp_path, monkeypatch):
+        templates = tmp_path / "templates"
+        repo_templates = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        shutil.copytree(os.path.join(repo_templates, "ThunderstorePackage"), templates / "ThunderstorePackage")
+        icon_template = templates / "ThunderstorePackage" / "icon.png"
+        icon_template.chmod(stat.S_IRUSR)
+        monkeypatch.setenv("BROFORCE_TEMPLATES_DIR", str(templates))
+
+        result = runner.invoke(app, [
+            "init-thunderstore", "NewMod", "-y",
+            "-n", "TestAuthor", "-d", "A mod", "-w", "https://example.com",
+        ])
+        assert result.exit_code == 0, result.output
+        icon = package_env / "Releases" / "NewMod" / "icon.png"
+        assert icon.read_bytes() == icon_template.read_bytes()
+        assert icon.stat().st_mode & stat.S_IWUSR
+
+    def test_non_interactive_skips_questionary(self, package_env, monkeypatch):
+        monkeypatch.delitem(sys.modules, "questionary", raising=False)
+        result = runner.invoke(app, [
+            "init-thunderstore", "NewMod", "-y",
+            "-n", "TestAuthor", "-d", "A mod", "-w", "https://example.com",
+        ])
+        assert result.exit_code == 0, result.output
+        assert "questionary" not in sys.modules
@@ -10,6 +10,7 @@ from broforce_tools.paths import (
     get_config_dir,
     get_repos_parent,
     get_templates_dir,
+    list_subdirs,
 )
 
 
@@ -113,3 +114,16 @@ class TestGetCacheDir:
         monkeypatch.setattr("broforce_tools.paths.is_windows", lambda: False)
         result = get_cache_dir()
         assert str(result).endswith(".cache/broforce-tools")
+
+
+class TestListSubdirs:
+    def test_only_directories(self, tmp_path):
+        (tmp_path / "RepoA").mkdir()
+        (tmp_path / "RepoB").mkdir()
+        (tmp_path / "notes.txt").write_text("")
+        assert sorted(list_subdirs(str(tmp_path))) == ["RepoA", "RepoB"]
+
+    def test_follows_symlinks(self, tmp_path):
+        (tmp_path / "Real").mkdir()
+        (tmp_path / "Link").symlink_to(tmp_path / "Real")
+        assert sorted(list_subdirs(str(tmp_path))) == ["Link", "Real"]
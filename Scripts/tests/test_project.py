@@ -9,6 +9,7 @@ from broforce_tools.project import (
     _is_direct_project,
     _normalize_wsl_path,
     count_projects_in_repo,
+    detect_metadata_dir_type,
     detect_current_repo,
     detect_project_type,
     find_mod_metadata_dir,
@@ -68,6 +69,16 @@ class TestProject:
         assert path is not None
         assert path == str(release)
 
+    def test_discovered_project_reuses_repo_count(self, fixtures_repos, monkeypatch):
+        project = find_project_by_name(str(fixtures_repos), "TestMod", repos=["TestRepo"])
+        assert project.repo_project_count == 3
+
+        def fail_count(*args):
+            raise AssertionError("should reuse the discovered project count")
+
+        monkeypatch.setattr("broforce_tools.project.count_projects_in_repo", fail_count)
+        assert project.get_releases_path().endswith(os.path.join("Releases", "TestMod"))
+
 
 # ---------------------------------------------------------------------------
 # Metadata detection (ported from test_templates.py)
@@ -94,6 +105,15 @@ class TestDetectProjectType:
         assert detect_project_type(str(proj)) == "wardrobe"
 
 
+class TestDetectMetadataDirType:
+    def test_bro_metadata_dir(self, fixtures_repos):
+        metadata_dir = fixtures_repos / "TestRepo" / "TestBro" / "_ModContent"
+        assert detect_metadata_dir_type(str(metadata_dir)) == "bro"
+
+    def test_missing_dir(self, tmp_path):
+        assert detect_metadata_dir_type(str(tmp_path / "missing")) is None
+
+
 class TestFindModMetadataDir:
     def test_finds_mod_metadata(self, fixtures_repos):
         result = find_mod_metadata_dir(str(fixtures_repos / "TestRepo" / "TestMod"))
@@ -119,6 +139,25 @@ class TestFindModMetadataDir:
         (bin_dir / "Info.json").write_text("{}")
         assert find_mod_metadata_dir(str(tmp_path)) is None
 
+    def test_depth_limit(self, tmp_path):
+        deepest = tmp_path / "a" / "b" / "c" / "d"
+        deepest.mkdir(parents=True)
+        (deepest / "Info.json").write_text("{}")
+        assert find_mod_metadata_dir(str(tmp_path)) == str(deepest)
+
+        too_deep = tmp_path / "x" / "b" / "c" / "d" / "e"
+        too_deep.mkdir(parents=True)
+        (too_deep / "Info.json").write_text("{}")
+        (deepest / "Info.json").unlink()
+        assert find_mod_metadata_dir(str(tmp_path)) is None
+
+    def test_prefers_shallower_sibling(self, tmp_path):
+        (tmp_path / "A" / "Nested").mkdir(parents=True)
+        (tmp_path / "A" / "Nested" / "Info.json").write_text("{}")
+        (tmp_path / "B").mkdir()
+        (tmp_path / "B" / "Info.json").write_text("{}")
+        assert find_mod_metadata_dir(str(tmp_path)) == str(tmp_path / "B")
+
 
 class TestGetSourceDirectory:
     def test_returns_parent_of_metadata(self, fixtures_repos):
@@ -238,6 +277,63 @@ class TestFindProjects:
         names = [p.name for p in projects]
         assert names == sorted(names)
 
+    def test_metadata_in_singular_release_folder(self, tmp_path):
+        repo = tmp_path / "Repo"
+        for name in ("ModA", "ModB"):
+            (repo / name / "_ModContent").mkdir(parents=True)
+            (repo / name / "_ModContent" / "Info.json").write_text("{}")
+        (repo / "Release" / "ModB").mkdir(parents=True)
+        (repo / "Release" / "ModB" / "manifest.json").write_text("{}")
+        projects = find_projects(str(tmp_path), ["Repo"], require_metadata=True)
+        assert [p.name for p in projects] == ["ModB"]
+
+    def test_single_project_manifest_at_release_root(self, tmp_path):
+        repo = tmp_path / "Repo"
+        (repo / "OnlyMod" / "_ModContent").mkdir(parents=True)
+        (repo / "OnlyMod" / "_ModContent" / "Info.json").write_text("{}")
+        (repo / "Release").mkdir()
+        (repo / "Release" / "manifest.json").write_text("{}")
+        projects = find_projects(str(tmp_path), ["Repo"])
+        assert projects[0].has_thunderstore_metadata
+
+    def test_manifest_folder_case_follows_filesystem(self, tmp_path, monkeypatch):
+        repo = tmp_path / "Repo"
+        for name in ("BroA", "BroB"):
+            (repo / name / "_ModContent").mkdir(parents=True)
+            (repo / name / "_ModContent" / "bro.mod.json").write_text("{}")
+        (repo / "Releases" / "brob").mkdir(parents=True)
+        (repo / "Releases" / "brob" / "manifest.json").write_text("{}")
+        projects = find_projects(str(tmp_path), ["Repo"])
+        assert [p.name for p in projects] == ["BroA", "BroB"]
+        assert not any(p.has_thunderstore_metadata for p in projects)
+        # Case-insensitive filesystems (Windows) fold names in normcase
+        monkeypatch.setattr(os.path, "normcase", str.lower)
+        projects = find_projects(str(tmp_path), ["Repo"], require_metadata=True)
+        assert [p.name for p in projects] == ["BroB"]
+
+    def test_release_dir_without_manifest(self, tmp_path):
+        repo = tmp_path / "Repo"
+        for name in ("ModA", "ModB"):
+            (repo / name / "_ModContent").mkdir(parents=True)
+            (repo / name / "_ModContent" / "Info.json").write_text("{}")
+        (repo / "Releases" / "ModA").mkdir(parents=True)
+        (repo / "Releases" / "ModB").write_text("not a folder")
+        projects = find_projects(str(tmp_path), ["Repo"])
+        assert not any(p.has_thunderstore_metadata for p in projects)
+
+    def test_name_prefix(self, fixtures_repos):
+        projects = find_projects(str(fixtures_repos), ["TestRepo"], name_prefix="test")
+        names = [p.name for p in projects]
+        assert "TestMod" in names
+        assert "TestBro" in names
+        assert "NewMod" not in names
+
+    def test_unmatched_name_prefix_skips_repo_count(self, fixtures_repos, monkeypatch):
+        def fail_count(*args):
+            raise AssertionError("repo counted without a matching project")
+        monkeypatch.setattr("broforce_tools.project.count_projects_in_repo", fail_count)
+        assert find_projects(str(fixtures_repos), ["TestRepo"], name_prefix="zzz") == []
+
     def test_ignores_configured_projects(self, fixtures_repos, isolated_config):
         config = {"repos": ["TestRepo"], "ignore": {"TestRepo": ["TestMod"]}}
         (isolated_config / "config.json").write_text(json.dumps(config))
@@ -301,6 +397,12 @@ class TestGroupDetection:
         expected = os.path.join(str(grouped_repo), "GroupedRepo", "MyGroup", "ProjectA")
         assert by_name["ProjectA"].project_dir == expected
 
+    def test_name_prefix_filters_flat_and_grouped(self, grouped_repo):
+        projects = find_projects(str(grouped_repo), ["GroupedRepo"], name_prefix="projecta")
+        assert [p.name for p in projects] == ["ProjectA"]
+        projects = find_projects(str(grouped_repo), ["GroupedRepo"], name_prefix="Flat")
+        assert [p.name for p in projects] == ["FlatProject"]
+
     def test_total_project_count(self, grouped_repo):
         projects = find_projects(str(grouped_repo), ["GroupedRepo"])
         assert len(projects) == 3
@@ -399,6 +501,15 @@ class TestGetReleasesPath:
         path = get_releases_path(str(tmp_path), "Repo", "Proj", create=True)
         assert "Release" in path
 
+    def test_no_release_folder_skips_project_count(self, tmp_path, monkeypatch):
+        (tmp_path / "Repo" / "Proj" / "_ModContent").mkdir(parents=True)
+
+        def fail_count(*args):
+            raise AssertionError("should not scan the repo")
+
+        monkeypatch.setattr("broforce_tools.project.count_projects_in_repo", fail_count)
+        assert get_releases_path(str(tmp_path), "Repo", "Proj", create=False) is None
+
 
 class TestCountProjectsInRepo:
     def test_testrepo(self, fixtures_repos):
@@ -469,6 +580,14 @@ class TestDetectCurrentRepo:
         result = detect_current_repo(str(tmp_path / "repos"))
         assert result is None
 
+    def test_sibling_with_shared_prefix(self, tmp_path, monkeypatch):
+        """A directory next to repos_parent whose name extends it is not inside it."""
+        (tmp_path / "repos" / "Repo").mkdir(parents=True)
+        sibling = tmp_path / "reposRepo"
+        sibling.mkdir()
+        monkeypatch.chdir(str(sibling))
+        assert detect_current_repo(str(tmp_path / "repos")) is None
+
     def test_case_insensitive(self, tmp_path, monkeypatch):
         repo = tmp_path / "MyRepo"
         repo.mkdir()
@@ -1,14 +1,23 @@
 """Tests for templates module - file operations and props parsing."""
+import errno
+import os
+import shutil
 import stat
+import time
 
 import pytest
 
+from broforce_tools import templates
 from broforce_tools.templates import (
+    copy_file,
     copyanything,
     find_props_file,
     find_replace,
+    find_replace_many,
     parse_props_file,
+    rename_and_replace,
     rename_files,
+    same_file_contents,
 )
 
 
@@ -46,6 +55,127 @@ class TestFindReplace:
         assert (tmp_path / "a.txt").read_text() == "new"
         assert (tmp_path / "b.txt").read_text() == "new value"
 
+    def test_untouched_when_no_match(self, tmp_path):
+        path = tmp_path / "test.txt"
+        path.write_text("Hello World")
+        os.utime(path, (0, 0))
+        find_replace(str(tmp_path), "Missing", "Python", "*.txt")
+        assert path.stat().st_mtime == 0
+
+
+class TestFindReplaceMany:
+    def test_applies_all_rules(self, tmp_path):
+        (tmp_path / "a.cs").write_text("Mod Template: ModTemplate by AUTHOR_NAME")
+        find_replace_many(str(tmp_path), [
+            ("*.cs", "Mod Template", "My Mod"),
+            ("*.cs", "ModTemplate", "MyMod"),
+            ("*.cs", "AUTHOR_NAME", "Me"),
+        ])
+        assert (tmp_path / "a.cs").read_text() == "My Mod: MyMod by Me"
+
+    def test_replacements_not_rescanned(self, tmp_path):
+        """A new name containing a template token must not be replaced again."""
+        (tmp_path / "a.cs").write_text("Mod Template / ModTemplate")
+        find_replace_many(str(tmp_path), [
+            ("*.cs", "Mod Template", "ModTemplate Plus"),
+            ("*.cs", "ModTemplate", "ModTemplatePlus"),
+        ])
+        assert (tmp_path / "a.cs").read_text() == "ModTemplate Plus / ModTemplatePlus"
+
+    def test_longest_find_wins(self, tmp_path):
+        (tmp_path / "a.csproj").write_text('<Compile Include="BroTemplate.cs" />')
+        find_replace_many(str(tmp_path), [
+            ("*.csproj", "BroTemplate", "MyBro"),
+            ("*.csproj", "BroTemplate.cs", "Bro.cs"),
+        ])
+        assert (tmp_path / "a.csproj").read_text() == '<Compile Include="Bro.cs" />'
+
+    def test_rules_gated_by_pattern(self, tmp_path):
+        (tmp_path / "a.csproj").write_text("BroTemplate.cs BROMAKER_VERSION")
+        (tmp_path / "a.json").write_text("BroTemplate.cs BROMAKER_VERSION")
+        find_replace_many(str(tmp_path), [
+            ("*.csproj", "BroTemplate.cs", "MyBro.cs"),
+            ("*.json", "BROMAKER_VERSION", "2.6.1"),
+        ])
+        assert (tmp_path / "a.csproj").read_text() == "MyBro.cs BROMAKER_VERSION"
+        assert (tmp_path / "a.json").read_text() == "BroTemplate.cs 2.6.1"
+
+    def test_cs_pattern_does_not_match_csproj(self, tmp_path):
+        (tmp_path / "a.csproj").write_text("X")
+        find_replace_many(str(tmp_path), [("*.cs", "X", "Y")])
+        assert (tmp_path / "a.csproj").read_text() == "X"
+
+    def test_untouched_when_no_rule_matches(self, tmp_path):
+        path = tmp_path / "a.cs"
+        path.write_text("Hello")
+        os.utime(path, (0, 0))
+        find_replace_many(str(tmp_path), [("*.cs", "Missing", "X"), ("*.json", "Hello", "X")])
+        assert path.stat().st_mtime == 0
+
+
+class TestRenameAndReplace:
+    def test_renames_then_rewrites_in_one_walk(self, tmp_path, monkeypatch):
+        project = tmp_path / "Mod Template"
+        project.mkdir()
+        (project / "Mod Template.csproj").write_text("<Name>Mod Template</Name>")
+        (project / "ModTemplate.cs").write_text("class ModTemplate {}")
+        walks = []
+        real_walk = os.walk
+        monkeypatch.setattr(os, "walk", lambda *a, **kw: walks.append(a) or real_walk(*a, **kw))
+        rename_and_replace(
+            str(tmp_path),
+            [("Mod Template", "My Mod"), ("ModTemplate", "MyMod")],
+            [("*.csproj", "Mod Template", "My Mod"), ("*.cs", "ModTemplate", "MyMod")],
+        )
+        assert len(walks) == 1
+        assert (tmp_path / "My Mod" / "My Mod.csproj").read_text() == "<Name>My Mod</Name>"
+        assert (tmp_path / "My Mod" / "MyMod.cs").read_text() == "class MyMod {}"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["My Mod"]
+
+    def test_rewrites_files_inside_renamed_directories(self, tmp_path):
+        inner = tmp_path / "OldName" / "OldName"
+        inner.mkdir(parents=True)
+        for i in range(10):
+            (inner / f"File{i}.cs").write_text("OldName")
+        rename_and_replace(str(tmp_path), [("OldName", "NewName")], [("*.cs", "OldName", "NewName")])
+        renamed = tmp_path / "NewName" / "NewName"
+        assert all((renamed / f"File{i}.cs").read_text() == "NewName" for i in range(10))
+
+    def test_rewrite_error_propagates(self, tmp_path, monkeypatch):
+        (tmp_path / "a.cs").write_text("OldName")
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(templates, "_rewrite_file", fail)
+        with pytest.raises(OSError, match="disk full"):
+            rename_and_replace(str(tmp_path), [], [("*.cs", "OldName", "NewName")])
+
+    def test_rewrite_preserves_bytes_around_matches(self, tmp_path):
+        (tmp_path / "a.cs").write_bytes(b"\xef\xbb\xbfclass OldName\r\n{\xff}\r\n")
+        rename_and_replace(str(tmp_path), [], [("*.cs", "OldName", "Caf\u00e9")])
+        assert (tmp_path / "a.cs").read_bytes() == b"\xef\xbb\xbfclass Caf\xc3\xa9\r\n{\xff}\r\n"
+
+    def test_large_file_rewritten(self, tmp_path):
+        big = tmp_path / "Big.cs"
+        big.write_text("// filler\n" * 40000 + "class OldName {}\n")
+        rename_and_replace(str(tmp_path), [], [("*.cs", "OldName", "NewName")])
+        assert big.read_text().endswith("class NewName {}\n")
+
+    def test_files_without_placeholders_untouched(self, tmp_path):
+        big = tmp_path / "Big.cs"
+        big.write_bytes(b"\xff not utf-8 \r\n" * 30000)
+        small = tmp_path / "Small.cs"
+        small.write_bytes(b"// nothing here\r\n")
+        rename_and_replace(str(tmp_path), [], [("*.cs", "OldName", "NewName")])
+        assert big.read_bytes() == b"\xff not utf-8 \r\n" * 30000
+        assert small.read_bytes() == b"// nothing here\r\n"
+
+    def test_renames_apply_in_order(self, tmp_path):
+        (tmp_path / "A.cs").write_text("")
+        rename_and_replace(str(tmp_path), [("A", "B"), ("B", "C")], [])
+        assert [p.name for p in tmp_path.iterdir()] == ["C.cs"]
+
 
 class TestRenameFiles:
     def test_renames_files(self, tmp_path):
@@ -56,6 +186,16 @@ class TestRenameFiles:
         assert (tmp_path / "NewName.csproj").exists()
         assert not (tmp_path / "OldName.cs").exists()
 
+    def test_keeps_multi_part_extension(self, tmp_path):
+        (tmp_path / "OldName.Designer.cs").write_text("code")
+        rename_files(str(tmp_path), "OldName", "NewName")
+        assert [p.name for p in tmp_path.iterdir()] == ["NewName.Designer.cs"]
+
+    def test_find_containing_dot(self, tmp_path):
+        (tmp_path / "Old.Name.cs").write_text("code")
+        rename_files(str(tmp_path), "Old.Name", "NewName")
+        assert [p.name for p in tmp_path.iterdir()] == ["NewName.cs"]
+
     def test_renames_directories(self, tmp_path):
         sub = tmp_path / "OldName"
         sub.mkdir()
@@ -72,6 +212,47 @@ class TestRenameFiles:
         rename_files(str(tmp_path), "OldName", "NewName")
         assert (tmp_path / "NewName" / "NewName" / "NewName.txt").exists()
 
+    def test_single_walk(self, tmp_path, monkeypatch):
+        """Nested directories must not trigger a fresh walk per subdirectory."""
+        deep = tmp_path / "a" / "b" / "c"
+        deep.mkdir(parents=True)
+        (deep / "OldName.cs").write_text("code")
+        walks = []
+        real_walk = os.walk
+        monkeypatch.setattr(os, "walk", lambda *a, **kw: walks.append(a) or real_walk(*a, **kw))
+        rename_files(str(tmp_path), "OldName", "NewName")
+        assert len(walks) == 1
+        assert (deep / "NewName.cs").exists()
+
+
+class TestCopyFile:
+    def test_copies_contents_and_mtime(self, tmp_path):
+        src = tmp_path / "src.targets"
+        src.write_bytes(b"<Project />" * 1000)
+        os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+        dst = tmp_path / "dst.targets"
+        copy_file(str(src), str(dst))
+        assert dst.read_bytes() == src.read_bytes()
+        assert dst.stat().st_mtime_ns == 1_000_000_000
+
+    def test_overwrites_longer_file(self, tmp_path):
+        src = tmp_path / "src.txt"
+        src.write_text("new")
+        dst = tmp_path / "dst.txt"
+        dst.write_text("old and much longer")
+        copy_file(str(src), str(dst))
+        assert dst.read_text() == "new"
+
+    def test_falls_back_when_unsupported(self, tmp_path, monkeypatch):
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "cross-device")
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        src = tmp_path / "src.txt"
+        src.write_text("data")
+        dst = tmp_path / "dst.txt"
+        copy_file(str(src), str(dst))
+        assert dst.read_text() == "data"
+
 
 class TestCopyanything:
     def test_copies_directory(self, tmp_path):
@@ -98,6 +279,35 @@ class TestCopyanything:
         assert not (dst / "file.user").exists()
         assert not (dst / ".vs").exists()
 
+    def test_copies_nested_tree(self, tmp_path):
+        src = tmp_path / "src"
+        for i in range(20):
+            sub = src / f"dir{i % 3}"
+            sub.mkdir(parents=True, exist_ok=True)
+            (sub / f"file{i}.cs").write_text(f"content {i}")
+        dst = tmp_path / "dst"
+        copyanything(str(src), str(dst))
+        for i in range(20):
+            assert (dst / f"dir{i % 3}" / f"file{i}.cs").read_text() == f"content {i}"
+
+    def test_reports_failed_file_copies(self, tmp_path, monkeypatch):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "good.txt").write_text("ok")
+        (src / "bad.txt").write_text("fails")
+        real_copy_file = templates.copy_file
+
+        def flaky_copy(src_file, dst_file):
+            if src_file.endswith("bad.txt"):
+                raise PermissionError("denied")
+            return real_copy_file(src_file, dst_file)
+
+        monkeypatch.setattr(templates, "copy_file", flaky_copy)
+        with pytest.raises(shutil.Error) as excinfo:
+            copyanything(str(src), str(tmp_path / "dst"))
+        assert [err[0] for err in excinfo.value.args[0]] == [str(src / "bad.txt")]
+        assert (tmp_path / "dst" / "good.txt").read_text() == "ok"
+
     def test_makes_writable(self, tmp_path):
         src = tmp_path / "src"
         src.mkdir()
@@ -109,6 +319,86 @@ class TestCopyanything:
         dst_file = dst / "readonly.txt"
         assert dst_file.stat().st_mode & stat.S_IWUSR
 
+    def test_read_only_source_directories(self, tmp_path, monkeypatch):
+        src = tmp_path / "src"
+        inner = src / "sub"
+        inner.mkdir(parents=True)
+        (src / "top.cs").write_text("top")
+        (inner / "inner.cs").write_text("inner")
+        real_copy_file = templates.copy_file
+
+        def checked_copy(src_file, dst_file):
+            # Give a premature copystat time to land; root ignores directory
+            # modes, so check the bit a normal user would hit
+            time.sleep(0.05)
+            assert os.stat(os.path.dirname(dst_file)).st_mode & stat.S_IWUSR
+            return real_copy_file(src_file, dst_file)
+
+        monkeypatch.setattr(templates, "copy_file", checked_copy)
+        read_only_dir = stat.S_IRUSR | stat.S_IXUSR | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+        inner.chmod(read_only_dir)
+        src.chmod(read_only_dir)
+        try:
+            dst = tmp_path / "dst"
+            copyanything(str(src), str(dst))
+        finally:
+            src.chmod(stat.S_IRWXU)
+            inner.chmod(stat.S_IRWXU)
+        assert (dst / "top.cs").read_text() == "top"
+        assert (dst / "sub" / "inner.cs").read_text() == "inner"
+        assert dst.stat().st_mode & stat.S_IWUSR
+        assert (dst / "sub").stat().st_mode & stat.S_IWUSR
+
+
+class TestMakeWritable:
+    def test_nested_read_only_tree(self, tmp_path):
+        inner = tmp_path / "root" / "sub"
+        inner.mkdir(parents=True)
+        (inner / "file.cs").write_text("code")
+        (inner / "file.cs").chmod(stat.S_IRUSR)
+        inner.chmod(stat.S_IRUSR | stat.S_IXUSR)
+        templates._make_writable(str(tmp_path / "root"))
+        assert inner.stat().st_mode & stat.S_IWUSR
+        assert (inner / "file.cs").stat().st_mode & stat.S_IWUSR
+
+    def test_skips_writable_entries(self, tmp_path, monkeypatch):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "file.cs").write_text("code")
+        chmods = []
+        monkeypatch.setattr(os, "chmod", lambda *args: chmods.append(args))
+        templates._make_writable(str(tmp_path))
+        assert chmods == []
+
+
+class TestSameFileContents:
+    def test_identical(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"icon")
+        (tmp_path / "b.png").write_bytes(b"icon")
+        assert same_file_contents(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+
+    def test_same_size_different_bytes(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"icon")
+        (tmp_path / "b.png").write_bytes(b"ican")
+        assert not same_file_contents(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+
+    def test_different_size(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"icon")
+        (tmp_path / "b.png").write_bytes(b"icons")
+        assert not same_file_contents(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+
+    def test_missing_file(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"icon")
+        assert not same_file_contents(str(tmp_path / "a.png"), str(tmp_path / "missing.png"))
+
+    def test_sees_rewritten_file(self, tmp_path):
+        a, b = tmp_path / "a.png", tmp_path / "b.png"
+        a.write_bytes(b"icon")
+        b.write_bytes(b"icon")
+        assert same_file_contents(str(a), str(b))
+        b.write_bytes(b"ican")
+        os.utime(b, ns=(0, 0))
+        assert not same_file_contents(str(a), str(b))
+
 
 class TestFindPropsFile:
     def test_finds_in_current_dir(self, tmp_path):
@@ -126,6 +416,12 @@ class TestFindPropsFile:
     def test_returns_none_when_not_found(self, tmp_path):
         assert find_props_file(str(tmp_path), "NonExistent.props") is None
 
+    def test_memoized_per_start_dir(self, tmp_path, monkeypatch):
+        (tmp_path / "Cached.props").write_text("<Project/>")
+        first = find_props_file(str(tmp_path), "Cached.props")
+        monkeypatch.setattr(os.path, "exists", lambda path: False)
+        assert find_props_file(str(tmp_path / "."), "Cached.props") == first
+
 
 class TestParsePropsFile:
     def test_extracts_namespaced_property(self, tmp_path):
@@ -152,6 +448,22 @@ class TestParsePropsFile:
         props.write_text('<Project><PropertyGroup></PropertyGroup></Project>')
         assert parse_props_file(str(props), "Missing") is None
 
+    def test_ignores_property_outside_property_group(self, tmp_path):
+        props = tmp_path / "test.props"
+        props.write_text(
+            '<Project>\n'
+            '  <ItemGroup><MyProp>wrong</MyProp></ItemGroup>\n'
+            '  <PropertyGroup><MyProp>right</MyProp></PropertyGroup>\n'
+            '</Project>'
+        )
+        assert parse_props_file(str(props), "MyProp") == "right"
+
+    def test_stops_at_first_match(self, tmp_path):
+        """Content after the match is never parsed."""
+        props = tmp_path / "test.props"
+        props.write_text('<Project><PropertyGroup><MyProp>value</MyProp></PropertyGroup><broken')
+        assert parse_props_file(str(props), "MyProp") == "value"
+
     def test_handles_malformed_xml(self, tmp_path):
         props = tmp_path / "bad.props"
         props.write_text("not xml at all")
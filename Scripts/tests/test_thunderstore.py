@@ -1,17 +1,28 @@
 """Tests for thunderstore module - version parsing, validation, dependencies."""
+import gzip
 import json
 import os
+import subprocess
+import sys
+import zipfile
 
 import pytest
 
+from broforce_tools import thunderstore
 from broforce_tools.thunderstore import (
+    FALLBACK_DEPENDENCY_VERSIONS,
+    _version_key,
+    _walk_files,
+    _write_files_to_zip,
     add_changelog_entry,
     clear_cache,
     compare_versions,
     detect_dependencies_from_csproj,
+    fetch_thunderstore_version,
     find_changelog,
     find_dll_in_modcontent,
     get_dependencies,
+    get_dependency_versions,
     get_latest_version_entries,
     get_unreleased_entries,
     get_version_from_changelog,
@@ -20,6 +31,7 @@ from broforce_tools.thunderstore import (
     sanitize_package_name,
     sync_version_file,
     validate_package_name,
+    write_file_atomic,
 )
 
 
@@ -91,6 +103,18 @@ class TestCompareVersions:
         assert compare_versions(None, None) == -1
 
 
+class TestVersionKey:
+    def test_orders_numerically(self):
+        versions = ["1.10.0", "1.2.0", "2.0", "1.2.0.1"]
+        assert sorted(versions, key=_version_key) == ["1.2.0", "1.2.0.1", "1.10.0", "2.0"]
+
+    def test_trailing_zeros_equal(self):
+        assert _version_key("1.0") == _version_key("1.0.0")
+
+    def test_not_numeric(self):
+        assert _version_key("1.0-beta") is None
+
+
 class TestGetLatestVersionEntries:
     def test_standard_version(self, tmp_changelog):
         path = tmp_changelog("## v1.0.0\n- Initial release\n")
@@ -166,6 +190,33 @@ class TestAddChangelogEntry:
     def test_fails_on_missing_file(self):
         assert not add_changelog_entry("/nonexistent/path", "Entry")
 
+    def test_failed_write_keeps_original(self, tmp_changelog, monkeypatch):
+        original = "## v1.0.0 (unreleased)\n- Existing\n"
+        path = tmp_changelog(original)
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail_replace)
+        assert not add_changelog_entry(path, "New feature")
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == original
+        assert not os.path.exists(path + ".tmp")
+
+
+class TestWriteFileAtomic:
+    def test_writes_text(self, tmp_path):
+        path = tmp_path / "Changelog.md"
+        path.write_text("old")
+        write_file_atomic(str(path), "## v1.0.0\n")
+        assert path.read_text(encoding="utf-8") == "## v1.0.0\n"
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_writes_bytes_verbatim(self, tmp_path):
+        path = tmp_path / "Changelog.md"
+        write_file_atomic(str(path), b"## v1.0.0\r\n")
+        assert path.read_bytes() == b"## v1.0.0\r\n"
+
 
 class TestFindChangelog:
     def test_finds_changelog_md(self, tmp_path):
@@ -213,6 +264,58 @@ class TestFindDllInModcontent:
     def test_missing_dir(self):
         assert find_dll_in_modcontent("/nonexistent") is None
 
+    def test_uses_given_listing(self, tmp_path):
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "Nested.dll").write_bytes(b"")
+        files = list(_walk_files(str(tmp_path)))
+        assert find_dll_in_modcontent(str(tmp_path), files) is None
+        (tmp_path / "Top.dll").write_bytes(b"")
+        assert find_dll_in_modcontent(str(tmp_path), files) is None
+        files = list(_walk_files(str(tmp_path)))
+        assert find_dll_in_modcontent(str(tmp_path), files) == str(tmp_path / "Top.dll")
+
+
+class TestWalkFiles:
+    def test_nested_arcnames(self, tmp_path):
+        (tmp_path / "UMM" / "Mods" / "MyMod").mkdir(parents=True)
+        (tmp_path / "UMM" / "Mods" / "MyMod" / "MyMod.dll").write_bytes(b"")
+        (tmp_path / "manifest.json").write_text("{}")
+        found = dict((arc, path) for path, arc in _walk_files(str(tmp_path)))
+        assert set(found) == {"manifest.json", "UMM/Mods/MyMod/MyMod.dll"}
+        assert found["manifest.json"] == str(tmp_path / "manifest.json")
+
+    def test_prefix(self, tmp_path):
+        (tmp_path / "Info.json").write_text("{}")
+        assert [arc for _, arc in _walk_files(str(tmp_path), "UMM/Mods/X/")] == ["UMM/Mods/X/Info.json"]
+
+    def test_skips_empty_dirs(self, tmp_path):
+        (tmp_path / "empty").mkdir()
+        assert list(_walk_files(str(tmp_path))) == []
+
+
+class TestWriteFilesToZip:
+    def test_bounds_read_ahead(self, tmp_path, monkeypatch):
+        files = []
+        for i in range(40):
+            path = tmp_path / f"file{i}.txt"
+            path.write_text(f"content {i}")
+            files.append((str(path), f"file{i}.txt"))
+        real_read_bytes = thunderstore._read_bytes
+        in_flight = []
+
+        with zipfile.ZipFile(tmp_path / "out.zip", "w") as zf:
+            def tracking_read(path):
+                in_flight.append(len(in_flight) - len(zf.filelist))
+                return real_read_bytes(path)
+
+            monkeypatch.setattr(thunderstore, "_read_bytes", tracking_read)
+            _write_files_to_zip(zf, files)
+
+        assert max(in_flight) <= thunderstore._ZIP_READ_AHEAD
+        with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+            assert zf.namelist() == [arcname for _, arcname in files]
+            assert zf.read("file7.txt") == b"content 7"
+
 
 class TestSyncVersionFile:
     def test_updates_info_json(self, tmp_mod_project):
@@ -250,6 +353,28 @@ class TestSyncVersionFile:
         assert not updated
         assert path is None
 
+    def test_uses_preloaded_data(self, tmp_mod_project):
+        modcontent = str(tmp_mod_project / "_ModContent")
+        preloaded = {"Id": "Preloaded", "Version": "1.0.0"}
+        updated, path = sync_version_file(modcontent, "mod", "2.0.0", _version_data=preloaded)
+        assert updated
+        assert preloaded["Version"] == "2.0.0"
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == preloaded
+
+    def test_failed_write_keeps_original(self, tmp_mod_project, monkeypatch):
+        modcontent = tmp_mod_project / "_ModContent"
+        original = (modcontent / "Info.json").read_text()
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail_replace)
+        updated, _ = sync_version_file(str(modcontent), "mod", "2.0.0")
+        assert not updated
+        assert (modcontent / "Info.json").read_text() == original
+        assert not (modcontent / "Info.json.tmp").exists()
+
 
 class TestGetVersionFromChangelog:
     def test_returns_version(self, tmp_changelog):
@@ -290,6 +415,12 @@ class TestGetVersionFromInfoJson:
     def test_wardrobe_no_version(self, tmp_path):
         assert get_version_from_info_json(str(tmp_path), "wardrobe") is None
 
+    def test_utf8_bom(self, tmp_path):
+        modcontent = tmp_path / "_ModContent"
+        modcontent.mkdir()
+        (modcontent / "Info.json").write_bytes(b'\xef\xbb\xbf{"Version": "1.2.3"}')
+        assert get_version_from_info_json(str(modcontent), "mod") == "1.2.3"
+
 
 class TestGetDependencies:
     def test_returns_formatted_strings(self):
@@ -301,6 +432,120 @@ class TestGetDependencies:
             assert len(parts) >= 3
 
 
+class _FakeResponse:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+
+    def read(self):
+        return self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestFetchThunderstoreVersion:
+    def test_decompresses_gzip_response(self, monkeypatch):
+        body = gzip.compress(json.dumps({"latest": {"version_number": "2.7.0"}}).encode())
+        requests = []
+
+        def fake_urlopen(req, timeout):
+            requests.append(req)
+            return _FakeResponse(body, {"Content-Encoding": "gzip", "ETag": '"abc"'})
+
+        monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+        assert fetch_thunderstore_version("alexneargarder", "BroMaker") == ("2.7.0", '"abc"')
+        assert requests[0].get_header("Accept-encoding") == "gzip"
+
+    def test_plain_response(self, monkeypatch):
+        body = json.dumps({"latest": {"version_number": "1.0.0"}}).encode()
+        monkeypatch.setattr("urllib.request.urlopen", lambda req, timeout: _FakeResponse(body, {}))
+        assert fetch_thunderstore_version("UMM", "UMM") == ("1.0.0", None)
+
+    def test_corrupt_gzip(self, monkeypatch):
+        monkeypatch.setattr(
+            "urllib.request.urlopen",
+            lambda req, timeout: _FakeResponse(b"not gzip", {"Content-Encoding": "gzip"}),
+        )
+        assert fetch_thunderstore_version("UMM", "UMM") == (None, None)
+
+
+class TestGetDependencyVersions:
+    def test_fetches_all_packages(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        monkeypatch.setattr(
+            "broforce_tools.thunderstore.fetch_thunderstore_version",
+            lambda namespace, package, etag=None: (None if package == "UMM" else f"9.{len(package)}.0", None),
+        )
+        versions = get_dependency_versions()
+        assert versions["UMM"] == FALLBACK_DEPENDENCY_VERSIONS["UMM"]
+        assert versions["RocketLib"] == "9.9.0"
+        assert versions["DresserMod"] == "9.10.0"
+        cache = json.loads((tmp_path / "broforce-tools" / "dependency_cache.json").read_text())
+        assert cache["fallbacks"] == ["UMM"]
+
+    def test_memoized_until_cache_cleared(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        calls = []
+        monkeypatch.setattr(
+            "broforce_tools.thunderstore.fetch_thunderstore_version",
+            lambda namespace, package, etag=None: (calls.append(package) or "1.0.0", None),
+        )
+        get_dependency_versions()
+        (tmp_path / "broforce-tools" / "dependency_cache.json").unlink()
+        get_dependency_versions()
+        assert len(calls) == len(FALLBACK_DEPENDENCY_VERSIONS)
+        clear_cache()
+        get_dependency_versions()
+        assert len(calls) == 2 * len(FALLBACK_DEPENDENCY_VERSIONS)
+
+    def test_expired_cache_revalidates_with_etag(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        cache_file = tmp_path / "broforce-tools" / "dependency_cache.json"
+        cache_file.parent.mkdir()
+        cache_file.write_text(json.dumps({
+            "timestamp": 0,
+            "versions": {name: "3.0.0" for name in FALLBACK_DEPENDENCY_VERSIONS},
+            "etags": {"UMM": '"umm-etag"'},
+        }))
+        sent = {}
+
+        def fake_fetch(namespace, package, etag=None):
+            sent[package] = etag
+            return (None, etag) if etag else ("4.0.0", f'"{package}"')
+
+        monkeypatch.setattr("broforce_tools.thunderstore.fetch_thunderstore_version", fake_fetch)
+        versions = get_dependency_versions()
+        assert sent["UMM"] == '"umm-etag"'
+        assert versions["UMM"] == "3.0.0"
+        assert versions["RocketLib"] == "4.0.0"
+        cache = json.loads(cache_file.read_text())
+        assert cache["timestamp"] > 0
+        assert cache["etags"]["UMM"] == '"umm-etag"'
+        assert cache["etags"]["RocketLib"] == '"RocketLib"'
+
+    def test_versionless_reply_with_etag_uses_fallback(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        monkeypatch.setattr(
+            "broforce_tools.thunderstore.fetch_thunderstore_version",
+            lambda namespace, package, etag=None: (None, '"new-etag"') if package == "UMM" else ("4.0.0", None),
+        )
+        versions = get_dependency_versions()
+        assert versions["UMM"] == FALLBACK_DEPENDENCY_VERSIONS["UMM"]
+        assert versions["RocketLib"] == "4.0.0"
+
+
+class TestLazyDependencyResolution:
+    def test_import_does_not_touch_cache(self, tmp_path):
+        """Importing the CLI must not read or fetch dependency versions."""
+        env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path))
+        subprocess.run([sys.executable, "-c", "import broforce_tools.cli"], env=env, check=True)
+        assert not (tmp_path / "broforce-tools").exists()
+
+
 class TestClearCache:
     def test_clears_existing(self, isolated_config):
         from broforce_tools.config import get_cache_file
@@ -338,3 +583,37 @@ class TestDetectDependenciesEdgeCases:
         )
         deps = detect_dependencies_from_csproj(str(proj))
         assert any("RocketLib" in d for d in deps)
+
+    def test_both_references_in_stable_order(self, tmp_path):
+        proj = tmp_path / "Proj"
+        proj.mkdir()
+        (proj / "Proj.csproj").write_text(
+            '<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">\n'
+            '  <ItemGroup>\n'
+            '    <Reference Include="BroMakerLib" />\n'
+            '    <Reference Include="RocketLib, Version=1.0.0" />\n'
+            '  </ItemGroup>\n'
+            '</Project>'
+        )
+        deps = detect_dependencies_from_csproj(str(proj))
+        assert len(deps) == 3
+        assert "UMM" in deps[0]
+        assert "RocketLib" in deps[1]
+        assert "BroMaker" in deps[2]
+
+    def test_reparses_after_edit(self, tmp_path):
+        proj = tmp_path / "Proj"
+        proj.mkdir()
+        csproj = proj / "Proj.csproj"
+        csproj.write_text('<Project><ItemGroup><Reference Include="RocketLib" /></ItemGroup></Project>')
+        assert len(detect_dependencies_from_csproj(str(proj))) == 2
+        csproj.write_text('<Project><ItemGroup></ItemGroup></Project>')
+        assert len(detect_dependencies_from_csproj(str(proj))) == 1
+
+    def test_ignores_csproj_below_depth_limit(self, tmp_path):
+        deep = tmp_path / "Proj" / "a" / "b" / "c"
+        deep.mkdir(parents=True)
+        (deep / "Deep.csproj").write_text('<Project><ItemGroup><Reference Include="RocketLib" /></ItemGroup></Project>')
+        assert len(detect_dependencies_from_csproj(str(tmp_path / "Proj"))) == 1
+        (deep.parent / "Shallow.csproj").write_text('<Project><ItemGroup><Reference Include="RocketLib" /></ItemGroup></Project>')
+        assert len(detect_dependencies_from_csproj(str(tmp_path / "Proj"))) == 2